@@ -1,8 +1,22 @@
 # Importando bibliotecas necessárias
-import pandas as pd
-from pycaret.time_series import TSForecastingExperiment
+# (o PyCaret só é importado pelo worker quando um treinamento é necessário)
+import time
+
+script_start, script_cpu = time.perf_counter(), time.process_time()
+
 import streamlit as st
 
+from previsao.baselines import METHODS as BASELINE_METHODS
+from previsao.baselines import baseline_forecast
+from previsao.bundle import load_latest_batch, load_latest_bundle
+from previsao.data import data_path, load_dataset
+from previsao.features import add_regressors
+from previsao.plots import figure_spec
+from previsao.profiling import Profiler, record_cold_start
+from previsao.report import results_analysis
+from previsao.scenarios import simulate_scenarios
+from previsao.worker import get_worker, request_forecast
+
 # Configuração da página do Streamlit
 st.set_page_config(
     page_title='Forecast Licenciamentos Automóveis',
@@ -80,11 +94,18 @@ with col3:
         use_container_width=True
     )
 
-# Carregando o arquivo Excel local
+# Indica se algum treinamento ainda está em andamento no worker
+training_pending = False
+
+# Tempos e memória de cada etapa desta execução da página
+profiler = Profiler()
+# Reexecuções automáticas enquanto o treino roda não gravam as métricas de novo
+polling_rerun = st.session_state.pop('polling_rerun', False)
+
+# Carregando a base (snapshot Parquet do arquivo Excel, reconvertido só quando a planilha muda)
 try:
-    data = pd.read_excel(r"C:\Tablets\Automoveis_2000.xlsx")
-    data['Mês'] = pd.to_datetime(data['Mês'])  # Ajustar o nome da coluna de data, se necessário
-    data.set_index('Mês', inplace=True)   # Definir a coluna de data como índice
+    with profiler.stage('Automoveis_2000', 'read_excel'):
+        data = load_dataset(data_path('Automoveis_2000.xlsx'), date_column='Mês')
     st.success("Base de dados carregada com sucesso.")         
 except Exception as e:
     st.error(f"Erro ao carregar a base de dados: {e}")
@@ -99,71 +120,114 @@ with col1:
     st.dataframe(data, use_container_width=True)    
 
 with col2:
-    # Configuração inicial do experimento
-    s = TSForecastingExperiment()
-    s.setup(data=data, target='AUTOMÓVEIS', session_id=123)
-    st.write("**Configuração inicial do PyCaret concluída.**")
-
-    # Comparar modelos
-    best = s.compare_models()
-
-
-    # Obter a tabela de comparação
-    comparison_df_sl = s.pull()
-    st.write("### Comparação de Modelos")
-    st.dataframe(comparison_df_sl)
-
-    # Botão para download da tabela de comparação
-    csv_me = comparison_df_sl.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "Baixar Comparação",
-        data=csv_me,
-        file_name="model_comparison.csv",
-        mime="text/csv",
-        key="download_button_comparison_sl"
-    )
-
-# Seção para visualização e previsões
-col1, col2, col3 = st.columns([1, 1, 1], gap='large')
-
-with col1:
-    st.write('**Time Series - Target = Automóveis**')
-    s.plot_model(best, plot='ts', display_format='streamlit')  
-
-with col2:
-    # Finalizar o modelo
-    final_best = s.finalize_model(best)    
-    st.write("**Modelo finalizado:**")
-    st.write(final_best)
-
-with col3:
-    # Plotar previsões
-    st.write("**Previsão com horizonte de 36 períodos:**")
-    s.plot_model(final_best, plot='forecast', data_kwargs={'fh': 36}, display_format='streamlit')
-
-# Exibindo previsões e métricas
-col1, col2, col3 = st.columns([3, 1, 1], gap='large')
-
-with col1:
-    predictions = s.predict_model(final_best, fh=36)
-    st.write("**Previsões:**")
-    st.dataframe(predictions, use_container_width=True)
+    # Usa o último pacote gerado pelo treinamento offline (python -m previsao train);
+    # sem pacote, setup, comparação e finalização rodam no worker em segundo plano
+    with profiler.stage('Automoveis_2000', 'carregar_resultado'):
+        result = load_latest_bundle('Automoveis_2000')
+        if result is None:
+            # Regressores exógenos (Selic, IPCA...) da pasta PREVISAO_EXOG_DIR, se houver
+            result, job = request_forecast(add_regressors(data, 'AUTOMÓVEIS', fh=36), target='AUTOMÓVEIS',
+                                           session_id=123, fh=36)
+    if result is None:
+        if job.stage == 'erro':
+            st.error(f"Erro no treinamento dos modelos: {job.future.exception()}")
+            if st.button("Tentar novamente", key=f'retry_{job.key}'):
+                get_worker().retry(job.key)
+                st.rerun()
+        else:
+            st.progress(job.fraction, text=f"Treinando modelos ({job.stage}) - {job.elapsed:.0f}s")
+            training_pending = True
+
+            # Previsão provisória com o melhor modelo base (NumPy) enquanto o treino roda
+            fallback, fallback_backtest = baseline_forecast(data['AUTOMÓVEIS'], fh=36)
+            st.write(f"**Previsão provisória - {fallback_backtest.scores['Model'].iloc[0]}:**")
+            st.line_chart(fallback.to_timestamp())
+    else:
+        profiler.extend(result.stage_timings, section='Automoveis_2000', origem='treinamento')
+        st.write("**Configuração inicial do PyCaret concluída.**")
+        if result.update_info:
+            info = result.update_info
+            st.caption(f"Atualização {info['mode']}: {info['new_points']} meses novos, MASE "
+                       f"{info['mase_new']:.3f} em {info.get('steps', info['new_points'])} passo(s) contra "
+                       f"{info.get('mase_ref', info['mase_cv']):.3f} no backtest no mesmo horizonte")
+
+        # Obter a tabela de comparação
+        comparison_df_sl = result.comparison
+        st.write("### Comparação de Modelos")
+        st.dataframe(comparison_df_sl)
+
+        # Botão para download da tabela de comparação
+        csv_me = comparison_df_sl.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            "Baixar Comparação",
+            data=csv_me,
+            file_name="model_comparison.csv",
+            mime="text/csv",
+            key="download_button_comparison_sl"
+        )
+
+        # Tempo de validação cruzada por modelo (modelos podados ou sem tempo aparecem aqui)
+        if result.timings is not None:
+            with st.expander('Tempo por modelo'):
+                st.dataframe(result.timings)
+                if result.baselines is not None:
+                    st.write("**Modelos base (marca inicial para a poda):**")
+                    st.dataframe(result.baselines)
+                if result.tuning is not None and len(result.tuning.trials):
+                    tuning = result.tuning
+                    st.write(f"**Ajuste de hiperparâmetros - MASE {tuning.mase_default:.3f} "
+                             f"para {tuning.mase_tuned:.3f}:**")
+                    st.dataframe(tuning.trials)
+
+if result is not None:
+    # Seção para visualização e previsões
+    col1, col2, col3 = st.columns([1, 1, 1], gap='large')
+
+    with col1:
+        st.write('**Time Series - Target = Automóveis**')
+        with profiler.stage('Automoveis_2000', 'plot_ts'):
+            st.plotly_chart(figure_spec(result, 'ts'), use_container_width=True)
+
+    with col2:
+        # Finalizar o modelo
+        final_best = result.describe_model()
+        st.write("**Modelo finalizado:**")
+        if isinstance(final_best, str):
+            st.text(final_best)
+        else:
+            st.write(final_best)
+
+    with col3:
+        # Plotar previsões
+        st.write("**Previsão com horizonte de 36 períodos:**")
+        with profiler.stage('Automoveis_2000', 'plot_forecast'):
+            st.plotly_chart(figure_spec(result, 'forecast'), use_container_width=True)
+
+    # Exibindo previsões e métricas
+    col1, col2, col3 = st.columns([3, 1, 1], gap='large')
+
+    with col1:
+        predictions = result.predictions
+        st.write("**Previsões:**")
+        st.dataframe(predictions, use_container_width=True)
     
-    # Botão para download das previsões
-    csv = predictions.to_csv(index=False).encode('utf-8')
-    st.download_button("Baixar Previsão",
-                        data=csv, 
-                        file_name="predictions.csv",
-                        mime='text/csv',
-                        key='download_button_previsao_sl')
-
-with col2:
-    st.write('Previsão 2025')
-    st.metric(label='2025: Previsão e Variação', value=2688487, delta=7.4)
-
-with col3:
-    st.write('Previsão 2026')
-    st.metric(label='2026: Previsão e Variação', value=2738146, delta=1.8)
+        # Botão para download das previsões
+        csv = predictions.to_csv(index=False).encode('utf-8')
+        st.download_button("Baixar Previsão",
+                            data=csv, 
+                            file_name="predictions.csv",
+                            mime='text/csv',
+                            key='download_button_previsao_sl')
+
+    # Totais anuais com faixa de 90% dos cenários Monte Carlo (anos completos do horizonte)
+    summary = simulate_scenarios(result)
+    if summary is not None:
+        for col, (year, row) in zip((col2, col3), summary.annual.tail(2).iterrows()):
+            with col:
+                st.write(f'Previsão {year}')
+                st.metric(label=f'{year}: Previsão e Variação', value=round(row['previsao']),
+                          delta=round(row['variacao_pct'], 1))
+                st.caption(f"Cenários 90%: {row['p05']:,.0f} a {row['p95']:,.0f}")
 
 
 col1, col2=st.columns([1,1], gap='large')
@@ -197,55 +261,10 @@ Este processo é particularmente útil em casos de séries temporais com fortes
    
 with col2:
     with st.expander('**Análise dos Resultados**'):
-        st.markdown('''Os resultados fornecidos indicam a performance do modelo **CatBoost Regressor com Condicional Deseasonalização e Detrend** na tarefa de previsão de séries temporais. Vamos analisar cada uma das métricas para entender o desempenho do modelo.
-
-### 1. **MASE (Mean Absolute Scaled Error)**
-   - **Valor**: 0.3158
-   - **Interpretação**: O MASE é uma métrica que compara o erro absoluto médio do modelo com o erro absoluto médio de um modelo de referência simples (normalmente uma previsão baseada no histórico). Um MASE abaixo de 1 indica que o modelo tem melhor desempenho do que o modelo de referência.
-   - **Análise**: O valor de **0.3158** é bem baixo, sugerindo que o modelo **CatBoost com deseasonalização e detrend** está performando significativamente melhor do que o modelo de referência. Ou seja, o modelo é eficaz na previsão da série temporal.
-
-### 2. **RMSSE (Root Mean Squared Scaled Error)**
-   - **Valor**: 0.2374
-   - **Interpretação**: O RMSSE é semelhante ao MASE, mas calcula a raiz quadrada do erro quadrático médio. Essa métrica também compara o erro do modelo com um modelo simples. Assim como o MASE, valores abaixo de 1 indicam bom desempenho.
-   - **Análise**: O valor de **0.2374** é também muito bom e sugere que o modelo está fornecendo previsões com um erro consideravelmente menor do que o modelo de referência.
-
-### 3. **MAE (Mean Absolute Error)**
-   - **Valor**: 9659.9057
-   - **Interpretação**: O MAE calcula o erro absoluto médio entre as previsões e os valores reais. Menores valores de MAE indicam melhores previsões, pois o erro médio entre as previsões e os valores reais é menor.
-   - **Análise**: O valor de **9659.9057** é uma medida de erro absoluto, e a análise desse número depende da escala dos dados. Se os valores da série temporal forem elevados, o MAE pode ser relativamente grande, mas considerando que esse é o valor médio de erro absoluto, ele deve ser comparado com os valores reais da série para uma interpretação mais precisa.
-
-### 4. **RMSE (Root Mean Squared Error)**
-   - **Valor**: 9659.9057
-   - **Interpretação**: O RMSE é semelhante ao MAE, mas dá mais peso aos erros maiores devido à sua base quadrada. Ele é sensível a grandes desvios, e valores menores indicam melhor desempenho.
-   - **Análise**: O valor de **9659.9057** para o RMSE sugere um erro médio relativamente grande (semelhante ao MAE), mas novamente, esse número precisa ser analisado em relação ao valor da série temporal. Se os valores da série são altos, esse erro pode ser aceitável.
-
-### 5. **MAPE (Mean Absolute Percentage Error)**
-   - **Valor**: 0.0394 (ou 3.94%)
-   - **Interpretação**: O MAPE calcula o erro percentual absoluto médio, ou seja, a diferença média percentual entre as previsões e os valores reais. Ele é útil quando se quer entender o erro em termos relativos. Valores menores indicam melhor desempenho.
-   - **Análise**: O valor de **0.0394** (ou 3.94%) sugere que o modelo está fazendo previsões com um erro percentual médio baixo, o que é uma excelente indicação de boa acurácia. O MAPE abaixo de 5% é normalmente considerado muito bom.
-
-### 6. **SMAPE (Symmetric Mean Absolute Percentage Error)**
-   - **Valor**: 0.0411 (ou 4.11%)
-   - **Interpretação**: O SMAPE é uma variação do MAPE que trata simetricamente os erros positivos e negativos, ou seja, é uma versão mais balanceada do MAPE. Ele é usado para medir a precisão de previsões de séries temporais. Como o MAPE, valores menores são desejáveis.
-   - **Análise**: O valor de **0.0411** (ou 4.11%) também é bom, indicando que o modelo tem um erro percentual simétrico muito baixo, semelhante ao MAPE. Isso reforça a alta precisão do modelo.
-
-### 7. **TT (Tempo Total em Segundos)**
-   - **Valor**: 1.5667 segundos
-   - **Interpretação**: Esse valor indica o tempo total que o modelo levou para treinar e fazer previsões. Em tarefas de previsão de séries temporais, é importante que o tempo de treinamento e previsão seja razoável, principalmente em ambientes de produção.
-   - **Análise**: O tempo de **1.5667 segundos** é muito baixo, indicando que o modelo foi capaz de treinar e fazer previsões rapidamente, o que é um ponto positivo em termos de eficiência.
-
----
-
-### Conclusão da Análise:
-
-O modelo **CatBoost Regressor com Condicional Deseasonalização e Detrend** apresenta **excelentes resultados** nas métricas de erro:
-
-- **MASE e RMSSE** muito baixos indicam que o modelo está superando o modelo de referência de forma consistente.
-- **MAPE e SMAPE baixos** indicam boa precisão relativa, com erros percentuais muito pequenos.
-- O **tempo de execução** de apenas **1.5667 segundos** sugere que o modelo é eficiente e adequado para cenários de previsão em tempo real.
-
-Em resumo, o modelo está bem ajustado, com **boa precisão e baixo erro**, sendo uma ótima escolha para tarefas de previsão de séries temporais. Isso indica que o pré-processamento (deseasonalização e detrend) aliado ao uso do CatBoost proporcionou um desempenho excepcional.
-''')
+        if result is not None:
+            st.markdown(results_analysis(result))
+        else:
+            st.caption('Métricas disponíveis ao fim do treinamento.')
 
 #Modelagem Atualizada dezembro/2024
 
@@ -266,12 +285,14 @@ Para 2025, além do crescimento de 5% nas vendas de automóveis, a Fenabrave pro
     
 with col3:
     st.subheader('Imagem Publicação Fenabrave', divider='violet')
-    st.image(r'C:\Tablets\fenabrave.png', use_container_width=True)
+    st.image(str(data_path('fenabrave.png')), use_container_width=True)
+
+# Resultado da base até 2023: sua previsão final é avaliada com os meses reais da base 2024
+result_2000 = result
 
 try:
-    data = pd.read_excel(r"C:\Tablets\Automoveis_2000_2024.xlsx")
-    data['Mês'] = pd.to_datetime(data['Mês'])  # Ajustar o nome da coluna de data, se necessário
-    data.set_index('Mês', inplace=True)   # Definir a coluna de data como índice
+    with profiler.stage('Automoveis_2000_2024', 'read_excel'):
+        data = load_dataset(data_path('Automoveis_2000_2024.xlsx'), date_column='Mês')
     st.success("Base de dados carregada com sucesso.")         
 except Exception as e:
     st.error(f"Erro ao carregar a base de dados: {e}")
@@ -285,79 +306,140 @@ with col1:
     st.dataframe(data, use_container_width=True)    
 
 with col2:
-    # Configuração inicial do experimento
-    s = TSForecastingExperiment()
-    s.setup(data=data, target='AUTOMÓVEIS', session_id=123)
-    st.write("**Configuração inicial do PyCaret concluída.**")
-
-    # Comparar modelos
-    best = s.compare_models()
-
-# Obter a tabela de comparação
-    comparison_df_sl = s.pull()
-    st.write("### Comparação de Modelos")
-    st.dataframe(comparison_df_sl)
-
-    # Botão para download da tabela de comparação
-    csv_auto = comparison_df_sl.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "Baixar Comparação",
-        data=csv_auto,
-        file_name="model_comparison.csv",
-        mime="text/csv",
-        key="download_button_comparison_auto"
-    )
-
-# Seção para visualização e previsões
-col1, col2, col3 = st.columns([1, 1, 1], gap='large')
-
-with col1:
-    st.write('**Time Series - Target = Automóveis**')
-    s.plot_model(best, plot='ts', display_format='streamlit')  
-
-with col2:
-    # Finalizar o modelo
-    final_best = s.finalize_model(best)        
-    st.write("**Modelo finalizado:**")
-    st.write(final_best)
-
-with col3:
-    # Plotar previsões
-    st.write("**Previsão com horizonte de 36 períodos:**")
-    s.plot_model(final_best, plot='forecast', data_kwargs={'fh': 36}, display_format='streamlit')
-
-# Exibindo previsões e métricas
-col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1], gap='large')
-
-with col1:
-    predictions = s.predict_model(final_best, fh=36)     
-    st.write("**Previsões:**")
-    st.dataframe(predictions, use_container_width=True)
+    # Usa o último pacote gerado pelo treinamento offline (python -m previsao train);
+    # sem pacote, setup, comparação e finalização rodam no worker em segundo plano
+    with profiler.stage('Automoveis_2000_2024', 'carregar_resultado'):
+        result = load_latest_bundle('Automoveis_2000_2024')
+        if result is None:
+            # Regressores exógenos (Selic, IPCA...) da pasta PREVISAO_EXOG_DIR, se houver
+            result, job = request_forecast(add_regressors(data, 'AUTOMÓVEIS', fh=36), target='AUTOMÓVEIS',
+                                           session_id=123, fh=36)
+    if result is None:
+        if job.stage == 'erro':
+            st.error(f"Erro no treinamento dos modelos: {job.future.exception()}")
+            if st.button("Tentar novamente", key=f'retry_{job.key}'):
+                get_worker().retry(job.key)
+                st.rerun()
+        else:
+            st.progress(job.fraction, text=f"Treinando modelos ({job.stage}) - {job.elapsed:.0f}s")
+            training_pending = True
+
+            # Previsão provisória com o melhor modelo base (NumPy) enquanto o treino roda
+            fallback, fallback_backtest = baseline_forecast(data['AUTOMÓVEIS'], fh=36)
+            st.write(f"**Previsão provisória - {fallback_backtest.scores['Model'].iloc[0]}:**")
+            st.line_chart(fallback.to_timestamp())
+    else:
+        profiler.extend(result.stage_timings, section='Automoveis_2000_2024', origem='treinamento')
+        st.write("**Configuração inicial do PyCaret concluída.**")
+        if result.update_info:
+            info = result.update_info
+            st.caption(f"Atualização {info['mode']}: {info['new_points']} meses novos, MASE "
+                       f"{info['mase_new']:.3f} em {info.get('steps', info['new_points'])} passo(s) contra "
+                       f"{info.get('mase_ref', info['mase_cv']):.3f} no backtest no mesmo horizonte")
+
+        # Obter a tabela de comparação
+        comparison_df_sl = result.comparison
+        st.write("### Comparação de Modelos")
+        st.dataframe(comparison_df_sl)
+
+        # Botão para download da tabela de comparação
+        csv_auto = comparison_df_sl.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            "Baixar Comparação",
+            data=csv_auto,
+            file_name="model_comparison.csv",
+            mime="text/csv",
+            key="download_button_comparison_auto"
+        )
+
+        # Tempo de validação cruzada por modelo (modelos podados ou sem tempo aparecem aqui)
+        if result.timings is not None:
+            with st.expander('Tempo por modelo'):
+                st.dataframe(result.timings)
+                if result.baselines is not None:
+                    st.write("**Modelos base (marca inicial para a poda):**")
+                    st.dataframe(result.baselines)
+                if result.tuning is not None and len(result.tuning.trials):
+                    tuning = result.tuning
+                    st.write(f"**Ajuste de hiperparâmetros - MASE {tuning.mase_default:.3f} "
+                             f"para {tuning.mase_tuned:.3f}:**")
+                    st.dataframe(tuning.trials)
+
+if result is not None:
+    # Seção para visualização e previsões
+    col1, col2, col3 = st.columns([1, 1, 1], gap='large')
+
+    with col1:
+        st.write('**Time Series - Target = Automóveis**')
+        with profiler.stage('Automoveis_2000_2024', 'plot_ts'):
+            st.plotly_chart(figure_spec(result, 'ts'), use_container_width=True)
+
+    with col2:
+        # Finalizar o modelo
+        final_best = result.describe_model()
+        st.write("**Modelo finalizado:**")
+        if isinstance(final_best, str):
+            st.text(final_best)
+        else:
+            st.write(final_best)
+
+    with col3:
+        # Plotar previsões
+        st.write("**Previsão com horizonte de 36 períodos:**")
+        with profiler.stage('Automoveis_2000_2024', 'plot_forecast'):
+            st.plotly_chart(figure_spec(result, 'forecast'), use_container_width=True)
+
+    # Exibindo previsões e métricas
+    col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1], gap='large')
+
+    with col1:
+        predictions = result.predictions
+        st.write("**Previsões:**")
+        st.dataframe(predictions, use_container_width=True)
     
-    # Botão para download das previsões
-    csv = predictions.to_csv(index=False).encode('utf-8')
-    st.download_button("Baixar Previsão",
-                        data=csv, 
-                        file_name="predictions.csv",
-                        mime='text/csv',
-                        key='download_button_previsao_auto')
-
-with col2:
-    st.write('Previsão 2025')
-    st.metric(label='2025: Previsão e Variação %', value=2654064, delta=6.7)
-
-with col3:
-    st.write('Previsão 2026')
-    st.metric(label='2026: Previsão e Variação %', value=2778932, delta=4.7)
-
-with col4:
-    st.write('Previsão 2027')
-    st.metric(label='2027: Previsão e Variação %', value=2841797, delta=2.3)
-
-with col5:
-    st.write('Acuracidade dezembro/2024')
-    st.metric(label='Dez 2024: Previsto', value=259110)
-    st.metric(label='Dez 2024: Real e Acuracidade %', value=243751, delta=-6.3)
+        # Botão para download das previsões
+        csv = predictions.to_csv(index=False).encode('utf-8')
+        st.download_button("Baixar Previsão",
+                            data=csv, 
+                            file_name="predictions.csv",
+                            mime='text/csv',
+                            key='download_button_previsao_auto')
+
+    # Totais anuais com faixa de 90% dos cenários Monte Carlo (anos completos do horizonte)
+    summary = simulate_scenarios(result)
+    if summary is not None:
+        for col, (year, row) in zip((col2, col3, col4), summary.annual.tail(3).iterrows()):
+            with col:
+                st.write(f'Previsão {year}')
+                st.metric(label=f'{year}: Previsão e Variação %', value=round(row['previsao']),
+                          delta=round(row['variacao_pct'], 1))
+                st.caption(f"Cenários 90%: {row['p05']:,.0f} a {row['p95']:,.0f}")
+
+    with col5:
+        # Previsto x real do último mês a partir dos folds já guardados, sem treino extra:
+        # a previsão final da base anterior vira um fold desta base; sem ela, vale a validação cruzada
+        backtest, winner = result.backtest, result.winner_id
+        if result_2000 is not None and result_2000.backtest is not None:
+            try:
+                backtest, winner = result_2000.backtest.copy(), result_2000.winner_id
+                backtest.extend(data['AUTOMÓVEIS'])
+            except ValueError:
+                backtest, winner = result.backtest, result.winner_id
+        point = backtest.last_point(winner) if backtest is not None else None
+        if point is None:
+            st.write('Acuracidade')
+            st.caption('Sem previsão anterior para o último mês.')
+        else:
+            st.write(f"Acuracidade {point['periodo']}")
+            st.metric(label=f"{point['periodo']}: Previsto", value=round(point['previsto']))
+            st.metric(label=f"{point['periodo']}: Real e Acuracidade %", value=round(point['real']),
+                      delta=round(point['erro_pct'], 1))
+        if backtest is not None:
+            with st.expander('Backtest por modelo'):
+                # Mesmas células (origem, passo) para todos: os candidatos só têm folds de um passo
+                st.dataframe(backtest.table())
+                st.caption('Vencedor e modelos base no horizonte inteiro:')
+                st.dataframe(backtest.table([winner, *BASELINE_METHODS]))
 
 
 col1, col2=st.columns([1,1], gap='large')
@@ -430,51 +512,58 @@ A técnica **Orthogonal Matching Pursuit com Condicional Deseasonalização e De
    
 with col2:
     with st.expander('**Análise dos Resultados**'):
-        st.markdown('''Com base nos resultados apresentados para o modelo **Orthogonal Matching Pursuit w/ Cond. Deseasonalize & Detrending** (omp_cds_dt), podemos realizar a seguinte análise:
-
-### Resultados:
-- **MASE (Mean Absolute Scaled Error)**: 0.3564  
-- **RMSSE (Root Mean Squared Scaled Error)**: 0.2680  
-- **MAE (Mean Absolute Error)**: 10,906.5668  
-- **RMSE (Root Mean Squared Error)**: 10,906.5668  
-- **MAPE (Mean Absolute Percentage Error)**: 0.0451  
-- **SMAPE (Symmetric Mean Absolute Percentage Error)**: 0.0463  
-- **Tempo de Treinamento (TT)**: 0.0433 segundos  
-
-### Análise dos Resultados:
-
-1. **MASE (Mean Absolute Scaled Error)**:
-   - O **MASE** de 0.3564 indica que o modelo tem um erro médio absoluto escalado de cerca de 35.64% em relação a uma previsão simples (como uma previsão com a média da série temporal).
-   - **Interpretação**: Quanto menor o MASE, melhor o modelo. Nesse caso, o MASE sugere que o modelo está proporcionando uma melhoria significativa em relação a uma simples previsão média, mas ainda há espaço para otimização.
-
-2. **RMSSE (Root Mean Squared Scaled Error)**:
-   - O **RMSSE** de 0.2680 indica que a raiz quadrada do erro quadrático médio escalado também está abaixo de 1, o que é um bom sinal de que o modelo está ajustando-se bem à série temporal. Isso significa que, em média, o erro quadrático do modelo é 26.80% do erro quadrático de uma previsão de média.
-
-3. **MAE (Mean Absolute Error)**:
-   - O **MAE** de 10,906.5668 mostra que, em média, o erro absoluto do modelo para cada previsão é de aproximadamente 10,906 unidades (ou qualquer que seja a unidade da variável prevista).
-   - **Interpretação**: Esse valor é relevante para entender a magnitude do erro em termos absolutos, mas, por si só, não diz muito sobre a qualidade do modelo, pois depende da escala dos dados.
-
-4. **RMSE (Root Mean Squared Error)**:
-   - O **RMSE** de 10,906.5668 é idêntico ao MAE, o que pode ser um sinal de que o modelo não apresenta grandes outliers, já que o RMSE é geralmente mais sensível a valores extremos do que o MAE. Isso sugere um desempenho equilibrado e sem grandes desvios.
-
-5. **MAPE (Mean Absolute Percentage Error)**:
-   - O **MAPE** de 0.0451 indica que o erro percentual médio é de 4.51%. Em geral, um MAPE abaixo de 10% é considerado bom, então esse valor sugere que o modelo está fazendo previsões razoavelmente precisas quando comparado aos valores reais.
-
-6. **SMAPE (Symmetric Mean Absolute Percentage Error)**:
-   - O **SMAPE** de 0.0463 (ou 4.63%) também é semelhante ao MAPE, indicando que a porcentagem de erro é bem controlada. O SMAPE é uma métrica mais robusta para séries temporais, pois lida de maneira equilibrada com os erros em valores próximos de zero, e esse valor também sugere um bom desempenho.
-
-7. **Tempo de Treinamento (TT)**:
-   - O **tempo de treinamento** foi de 0.0433 segundos, o que é extremamente rápido e eficiente. Isso é especialmente importante para grandes volumes de dados ou quando o modelo precisa ser treinado repetidamente.
-
-### Conclusão:
-
-Com base nesses resultados, o modelo **Orthogonal Matching Pursuit com Condicional Deseasonalização e Detrend (omp_cds_dt)** apresenta um bom desempenho na previsão da série temporal. O modelo conseguiu reduzir os erros de previsão com relação à média simples e gerou previsões com uma baixa margem de erro percentual. O tempo de treinamento também foi muito eficiente.
-
-Em resumo:
-- O modelo é eficaz em remover tendências e sazonalidades, e em fazer previsões com boa precisão.
-- As métricas de erro sugerem que o modelo é robusto e oferece uma boa capacidade de previsão.
-- A velocidade de treinamento é excelente, o que indica boa escalabilidade em caso de implementação em problemas maiores ou em tempo real.
-
-Embora os resultados sejam positivos, seria interessante testar outras abordagens de modelagem ou ajustar os hiperparâmetros para melhorar ainda mais a precisão do modelo, se necessário.
-''')
-
+        if result is not None:
+            st.markdown(results_analysis(result))
+        else:
+            st.caption('Métricas disponíveis ao fim do treinamento.')
+
+# Previsões de todos os segmentos (geradas por: python -m previsao batch --data ...)
+batch = load_latest_batch('Automoveis_2000_2024')
+if batch is not None:
+    batch_predictions, batch_winners = batch
+    st.header("Forecast por Segmento - Anfavea", divider='green')
+
+    col1, col2 = st.columns([2, 1], gap='large')
+
+    with col1:
+        serie = st.selectbox('Série', batch_winners['serie'])
+        serie_predictions = batch_predictions[batch_predictions['serie'] == serie]
+        st.line_chart(serie_predictions.set_index('periodo')['previsao'])
+
+    with col2:
+        st.write("**Modelo vencedor por série:**")
+        st.dataframe(batch_winners, use_container_width=True)
+
+        # Botão para download das previsões de todas as séries
+        csv_batch = batch_predictions.to_csv(index=False).encode('utf-8')
+        st.download_button("Baixar Previsões por Segmento",
+                            data=csv_batch,
+                            file_name="predictions_series.csv",
+                            mime='text/csv',
+                            key='download_button_previsao_series')
+
+# Diagnóstico de desempenho: tempo de parede, CPU (processo e filhos) e picos de RSS de cada etapa
+profiler.record('app', 'script_run', time.perf_counter() - script_start, time.process_time() - script_cpu)
+cold_start = record_cold_start(profiler)
+with st.expander('Diagnóstico de desempenho'):
+    if cold_start is not None:
+        st.metric(label='Cold start do processo (s)', value=round(cold_start, 2))
+    stages_df = profiler.to_frame()
+    st.dataframe(stages_df, use_container_width=True)
+    st.caption("Etapas com origem 'treinamento' foram medidas quando o modelo foi treinado. "
+               "cpu_s inclui os processos filhos da etapa (children_cpu_s), como os da comparação e do "
+               "ajuste; no Windows é só a do processo. stage_peak_rss_mb é o pico da etapa (só no Linux) "
+               "e process_max_rss_mb o pico do processo até o fim da etapa.")
+if not polling_rerun:
+    try:
+        # As etapas do treinamento já foram gravadas pelo processo que treinou
+        profiler.write_jsonl(records=[r for r in profiler.records if r.get('origem') != 'treinamento'])
+        profiler.write_prometheus()
+    except OSError as e:
+        st.warning(f"Não foi possível gravar as métricas de desempenho: {e}")
+
+# Recarrega a página até que os treinamentos em segundo plano terminem
+if training_pending:
+    time.sleep(2)
+    st.session_state['polling_rerun'] = True
+    st.rerun()
@@ -0,0 +1,171 @@
+# Benchmark reprodutível do pipeline de previsão (offline, somente CPU)
+#
+# Uso:
+#   python benchmarks/bench_pipeline.py                      # mede e compara com o baseline
+#   python benchmarks/bench_pipeline.py --update-baseline    # grava o baseline atual
+#   python benchmarks/bench_pipeline.py --years 10 25 --series 8 --repeat 3
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from previsao.data import data_path, load_dataset  # noqa: E402
+from previsao.pipeline import train_forecast  # noqa: E402
+from previsao.profiling import Profiler  # noqa: E402
+
+HERE = Path(__file__).resolve().parent
+BASELINE_FILE = HERE / 'baseline.json'
+RESULTS_DIR = HERE / 'results'
+
+# Piora relativa a partir da qual uma etapa é considerada regressão
+TOLERANCE = 0.20
+# Etapas muito rápidas oscilam demais; abaixo deste tempo não se compara
+MIN_SECONDS = 0.05
+
+SHIPPED = ('Automoveis_2000.xlsx', 'Automoveis_2000_2024.xlsx')
+
+
+def synthetic_series(years, n_series=1, seed=123, start='2000-01-01'):
+    """Séries mensais com tendência, sazonalidade anual e ruído (semente fixa)."""
+    rng = np.random.default_rng(seed)
+    n = years * 12
+    t = np.arange(n)
+    index = pd.date_range(start, periods=n, freq='MS', name='Mês')
+    columns = {}
+    for i in range(n_series):
+        level = rng.uniform(5e4, 2.5e5)
+        trend = rng.uniform(-0.001, 0.004) * level * t
+        season = level * rng.uniform(0.05, 0.15) * np.sin(2 * np.pi * (t + rng.integers(12)) / 12)
+        noise = rng.normal(0, level * 0.04, n)
+        name = 'AUTOMÓVEIS' if i == 0 else f'SERIE_{i:02d}'
+        columns[name] = np.maximum(level + trend + season + noise, 0).round().astype(np.int64)
+    return pd.DataFrame(columns, index=index)
+
+
+def bench_dataset(label, xlsx, profiler, fh, budget):
+    # Leitura fria (converte o Excel) e quente (snapshot Parquet)
+    with tempfile.TemporaryDirectory() as snapshots:
+        with profiler.stage(label, 'load_excel'):
+            data = load_dataset(xlsx, snapshot_dir=snapshots)
+        with profiler.stage(label, 'load_snapshot'):
+            data = load_dataset(xlsx, snapshot_dir=snapshots)
+    result = train_forecast(data, target='AUTOMÓVEIS', fh=fh, budget=budget)
+    profiler.extend(result.stage_timings, section=label)
+
+
+def bench_many(label, data, profiler, fh, budget, n_jobs):
+    from previsao.batch import forecast_many
+
+    # Cache vazio nos processos filhos para medir o treinamento, não a leitura do cache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        previous = os.environ.get('PREVISAO_CACHE_DIR')
+        os.environ['PREVISAO_CACHE_DIR'] = cache_dir
+        try:
+            with profiler.stage(label, 'batch_forecast'):
+                forecast_many(data, fh=fh, budget=budget, n_jobs=n_jobs)
+        finally:
+            if previous is None:
+                os.environ.pop('PREVISAO_CACHE_DIR', None)
+            else:
+                os.environ['PREVISAO_CACHE_DIR'] = previous
+
+
+def run(args):
+    timings = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        datasets = []
+        for name in SHIPPED:
+            path = data_path(name)
+            if path.exists():
+                datasets.append((Path(name).stem, path))
+            else:
+                print(f'Ignorando {name}: não encontrado em {path.parent}')
+        for years in args.years:
+            path = Path(workdir) / f'synthetic_{years}y.xlsx'
+            synthetic_series(years).to_excel(path)
+            datasets.append((f'synthetic_{years}y', path))
+
+        for repeat in range(args.repeat):
+            profiler = Profiler()
+            for label, path in datasets:
+                print(f'[{repeat + 1}/{args.repeat}] {label}')
+                bench_dataset(label, path, profiler, args.fh, args.budget)
+            if args.series > 1:
+                label = f'synthetic_{args.series}x25y'
+                print(f'[{repeat + 1}/{args.repeat}] {label}')
+                bench_many(label, synthetic_series(25, n_series=args.series), profiler,
+                           args.fh, args.budget, args.jobs)
+            for record in profiler.records:
+                timings.setdefault(f"{record['section']}/{record['stage']}", []).append(record['wall_s'])
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor()},
+        'params': {'fh': args.fh, 'budget': args.budget, 'years': args.years,
+                   'series': args.series, 'repeat': args.repeat},
+        # Mediana das repetições, em segundos
+        'stages': {key: round(statistics.median(values), 4) for key, values in sorted(timings.items())},
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lista as etapas que ficaram mais lentas que o baseline além da tolerância."""
+    regressions = []
+    for key, seconds in results['stages'].items():
+        reference = baseline.get('stages', {}).get(key)
+        if reference is None or max(seconds, reference) < MIN_SECONDS:
+            continue
+        change = seconds / reference - 1
+        if change > tolerance:
+            regressions.append((key, reference, seconds, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline de previsão')
+    parser.add_argument('--years', type=int, nargs='+', default=[10, 25, 50])
+    parser.add_argument('--series', type=int, default=8, help='séries do cenário em lote (1 desliga)')
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--fh', type=int, default=36)
+    parser.add_argument('--budget', type=float, default=None)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}.json"
+    out.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f'Resultados gravados em {out}')
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f'Baseline atualizado em {args.baseline}')
+        return 0
+    if not args.baseline.exists():
+        print('Sem baseline para comparar (use --update-baseline).')
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+    for key, reference, seconds, change in regressions:
+        print(f'REGRESSÃO {key}: {reference:.3f}s -> {seconds:.3f}s (+{change:.0%})')
+    if not regressions:
+        print('Nenhuma regressão acima da tolerância.')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
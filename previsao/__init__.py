@@ -0,0 +1,77 @@
+# Pacote de apoio ao app de previsão de licenciamentos de automóveis
+#
+# Os nomes públicos são importados sob demanda (PEP 562): ``import previsao``
+# não carrega pandas, PyCaret ou o pool de processos até que sejam usados.
+import importlib
+
+_EXPORTS = {
+    'BacktestStore': 'backtest',
+    'BaselineBacktest': 'baselines',
+    'backtest_baselines': 'baselines',
+    'baseline_forecast': 'baselines',
+    'experiment_baselines': 'baselines',
+    'BatchResult': 'batch',
+    'forecast_many': 'batch',
+    'latest_bundle': 'bundle',
+    'load_bundle': 'bundle',
+    'load_latest_batch': 'bundle',
+    'load_latest_bundle': 'bundle',
+    'write_batch_bundle': 'bundle',
+    'write_bundle': 'bundle',
+    'ResultCache': 'cache',
+    'cache_key': 'cache',
+    'get_cache': 'cache',
+    'hash_dataframe': 'cache',
+    'ComparisonResult': 'compare',
+    'parallel_compare': 'compare',
+    'compact_dtypes': 'data',
+    'data_path': 'data',
+    'load_dataset': 'data',
+    'FeatureStore': 'features',
+    'add_regressors': 'features',
+    'load_regressors': 'features',
+    'TrainingState': 'incremental',
+    'update_forecast': 'incremental',
+    'ForecastResult': 'pipeline',
+    'STAGES': 'pipeline',
+    'forecast_key': 'pipeline',
+    'refit_forecast': 'pipeline',
+    'run_forecast': 'pipeline',
+    'train_forecast': 'pipeline',
+    'downsample': 'plots',
+    'figure_spec': 'plots',
+    'Profiler': 'profiling',
+    'append_jsonl': 'profiling',
+    'peak_rss_mb': 'profiling',
+    'process_uptime': 'profiling',
+    'record_cold_start': 'profiling',
+    'rss_mb': 'profiling',
+    'ModelRegistry': 'registry',
+    'ScenarioSummary': 'scenarios',
+    'simulate_paths': 'scenarios',
+    'simulate_scenarios': 'scenarios',
+    'ForecastService': 'serve',
+    'run_server': 'serve',
+    'TuningResult': 'tuning',
+    'cached_tuning': 'tuning',
+    'tune_winner': 'tuning',
+    'TrainingJob': 'worker',
+    'TrainingWorker': 'worker',
+    'get_worker': 'worker',
+    'request_forecast': 'worker',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# A guarda é necessária: os processos "spawn" reimportam o módulo principal
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# Backtest de origem móvel com folds reaproveitáveis e métricas vetorizadas
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .metrics import METRIC_COLUMNS, score_folds
+
+SEASONAL_PERIOD = 12
+
+
+class BacktestStore:
+    """Folds de janela expansiva e previsões por fold, guardados em arrays compactos.
+
+    Cada fold é identificado pela sua origem (tamanho do treino). As previsões
+    de cada modelo ficam em uma matriz float32 (folds x horizonte), com NaN
+    onde o modelo não tem previsão. Os valores reais não são guardados por
+    fold: vêm da série, então um mês novo completa os folds existentes sem
+    recalcular nada, e as métricas saem de uma única operação vetorizada.
+    """
+
+    def __init__(self, y, horizon, sp=SEASONAL_PERIOD, index=None):
+        # float32 representa exatamente contagens mensais (inteiros até 16 milhões)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.index = index if index is not None else getattr(y, 'index', None)
+        self.horizon = int(horizon)
+        self.sp = int(sp)
+        self.origins = np.empty(0, dtype=np.int32)
+        self.predictions = {}
+
+    @classmethod
+    def build(cls, y, horizon, initial=None, step=1, sp=SEASONAL_PERIOD):
+        """Cria o store com todas as origens de ``initial`` até o fim da série."""
+        store = cls(y, horizon, sp=sp)
+        initial = 3 * sp if initial is None else initial
+        store.add_origins(np.arange(initial, len(store.y), step))
+        return store
+
+    def __len__(self):
+        return len(self.origins)
+
+    @property
+    def models(self):
+        return list(self.predictions)
+
+    def copy(self):
+        store = type(self)(self.y.copy(), self.horizon, sp=self.sp, index=self.index)
+        store.origins = self.origins.copy()
+        store.predictions = {m: p.copy() for m, p in self.predictions.items()}
+        return store
+
+    def extend(self, y):
+        """Acrescenta meses novos; a série anterior precisa ser um prefixo de ``y``."""
+        values = np.asarray(y, dtype=np.float32)
+        n = len(self.y)
+        if len(values) < n or not np.array_equal(values[:n], self.y):
+            raise ValueError('A nova série não estende a série do backtest')
+        self.y = values
+        if getattr(y, 'index', None) is not None:
+            self.index = y.index
+        return len(values) - n
+
+    def add_origins(self, origins):
+        origins = np.asarray(origins, dtype=np.int32)
+        new = np.setdiff1d(origins, self.origins)
+        if not len(new):
+            return
+        merged = np.union1d(self.origins, new).astype(np.int32)
+        positions = np.searchsorted(merged, self.origins)
+        for model, preds in self.predictions.items():
+            grown = np.full((len(merged), self.horizon), np.nan, dtype=np.float32)
+            grown[positions] = preds
+            self.predictions[model] = grown
+        self.origins = merged
+
+    def _row(self, origin):
+        return int(np.searchsorted(self.origins, origin))
+
+    def _matrix(self, model):
+        if model not in self.predictions:
+            self.predictions[model] = np.full((len(self.origins), self.horizon), np.nan, dtype=np.float32)
+        return self.predictions[model]
+
+    def add_fold(self, model, origin, preds):
+        """Guarda previsões já calculadas (ex.: folds da comparação ou a previsão final)."""
+        self.add_origins([origin])
+        preds = np.asarray(preds, dtype=np.float32)[:self.horizon]
+        row = self._matrix(model)[self._row(origin)]
+        row[:] = np.nan
+        row[:len(preds)] = preds
+
+    def run(self, model, forecaster, origins=None):
+        """Calcula só os folds ainda sem previsão de ``model``.
+
+        ``forecaster(y, origins, horizon, sp)`` devolve uma matriz (origens x
+        horizonte), como os modelos base de ``previsao.baselines``.
+        """
+        if origins is not None:
+            self.add_origins(origins)
+        matrix = self._matrix(model)
+        missing = np.isnan(matrix).all(axis=1) & (self.origins >= max(2, 2 * self.sp))
+        if missing.any():
+            y = self.y.astype(np.float64)
+            matrix[missing] = forecaster(y, self.origins[missing].astype(np.int64), self.horizon, self.sp)
+        return int(missing.sum())
+
+    def actual(self):
+        idx = self.origins[:, None].astype(np.int64) + np.arange(self.horizon)
+        inside = idx < len(self.y)
+        return np.where(inside, self.y[np.minimum(idx, len(self.y) - 1)].astype(np.float64), np.nan)
+
+    def scores(self, model, steps=None):
+        """Métricas por fold (apenas folds com previsão e ao menos um valor real).
+
+        ``steps`` limita cada fold aos primeiros passos do horizonte.
+        """
+        preds = self.predictions[model].astype(np.float64)
+        if steps is not None:
+            preds[:, steps:] = np.nan
+        return self._fold_scores(preds)
+
+    def _fold_scores(self, preds):
+        # Métricas por fold de uma matriz de previsões (NaN nas células fora da avaliação)
+        actual = self.actual()
+        usable = ~np.isnan(preds).all(axis=1) & ~np.isnan(actual).all(axis=1)
+        sp = self.sp if self.origins[usable].min(initial=len(self.y)) > self.sp else 1
+        actual = np.where(np.isnan(preds), np.nan, actual)
+        folds = score_folds(actual[usable], preds[usable], self.y.astype(np.float64), self.origins[usable], sp)
+        return pd.DataFrame(folds, index=pd.Index(self.origins[usable], name='origem'))
+
+    def horizon_mase(self, model, steps, before=None):
+        """MASE médio de ``model`` nos ``steps`` primeiros passos, em folds que os preveem por inteiro.
+
+        Só entram folds cujos ``steps`` meses já eram observados antes de
+        ``before`` (o fim da série por padrão). ``NaN`` se não houver nenhum.
+        """
+        preds = self.predictions.get(model)
+        steps = min(int(steps), self.horizon)
+        before = len(self.y) if before is None else before
+        if preds is None or steps < 1:
+            return float('nan')
+        full = ~np.isnan(preds[:, :steps]).any(axis=1) & (self.origins + steps <= before)
+        if not full.any():
+            return float('nan')
+        folds = self.scores(model, steps=steps)
+        return float(folds.loc[self.origins[full], 'MASE'].mean())
+
+    def table(self, models=None):
+        """Média das métricas por modelo, no formato da tabela de comparação.
+
+        Os modelos (por padrão, todos) são avaliados nas mesmas células
+        (origem, passo): as que todos eles preveem e que já têm valor real.
+        Candidatos da comparação só têm folds de um passo, os modelos base têm
+        o horizonte inteiro; sem isso o ranking misturaria horizontes.
+        """
+        models = list(self.predictions) if models is None else [m for m in models if m in self.predictions]
+        common = ~np.isnan(self.actual())
+        for model in models:
+            common &= ~np.isnan(self.predictions[model])
+        if not models or not common.any():
+            return pd.DataFrame()
+        rows = {}
+        for model in models:
+            folds = self._fold_scores(np.where(common, self.predictions[model], np.nan).astype(np.float64))
+            rows[model] = dict(folds[list(METRIC_COLUMNS)].mean(), Folds=len(folds), Passos=int(common.sum()))
+        return pd.DataFrame.from_dict(rows, orient='index').sort_values('MASE')
+
+    def last_point(self, model=None):
+        """Último mês observado previsto pelo fold mais recente (o "previsto x real" do mês).
+
+        Retorna ``None`` se nenhum fold anterior ao fim da série tiver previsão.
+        """
+        n = len(self.y)
+        models = [model] if model is not None else list(self.predictions)
+        best = None
+        for name in models:
+            matrix = self.predictions.get(name)
+            if matrix is None:
+                continue
+            for row in np.flatnonzero(self.origins < n)[::-1]:
+                step = n - 1 - int(self.origins[row])
+                if step < self.horizon and not np.isnan(matrix[row, step]):
+                    if best is None or self.origins[row] > best[1]:
+                        best = (name, int(self.origins[row]), step, float(matrix[row, step]))
+                    break
+        if best is None:
+            return None
+        name, origin, step, predicted = best
+        real = float(self.y[n - 1])
+        return {
+            'modelo': name,
+            'periodo': str(self.index[n - 1])[:7] if self.index is not None else n - 1,
+            'previsto': predicted,
+            'real': real,
+            'erro_pct': (real - predicted) / real * 100 if real else float('nan'),
+        }
+
+    def save(self, path):
+        path = Path(path)
+        arrays = {'y': self.y, 'origins': self.origins, 'meta': np.array([self.horizon, self.sp])}
+        models = list(self.predictions)
+        arrays.update({f'pred_{i}': self.predictions[m] for i, m in enumerate(models)})
+        arrays['models'] = np.array(models, dtype=str)
+        if self.index is not None:
+            arrays['index'] = np.asarray(self.index.astype(str), dtype=str)
+        np.savez_compressed(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            horizon, sp = (int(v) for v in f['meta'])
+            index = pd.Index(f['index']) if 'index' in f.files else None
+            store = cls(f['y'], horizon, sp=sp, index=index)
+            store.origins = f['origins'].astype(np.int32)
+            store.predictions = {str(m): f[f'pred_{i}'].astype(np.float32) for i, m in enumerate(f['models'])}
+        return store
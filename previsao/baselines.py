@@ -0,0 +1,246 @@
+# Modelos base vetorizados em NumPy (ingênuo sazonal, drift, Holt-Winters, Theta)
+#
+# Todas as origens de previsão (folds de janela expansiva) são avaliadas em uma
+# única passada pela série: como as janelas compartilham o mesmo prefixo, o
+# estado dos métodos recursivos em cada origem é o mesmo para todos os folds.
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .metrics import METRIC_COLUMNS, score_folds
+
+SEASONAL_PERIOD = 12
+
+# Grades de parâmetros avaliadas de uma vez (escolha por SSE dentro da amostra)
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.01, 0.05, 0.1, 0.2])
+GAMMAS = np.array([0.05, 0.1, 0.2, 0.4])
+
+# Menor treino de um fold (drift, Theta e a escala do MASE precisam de dois pontos)
+MIN_ORIGIN = 2
+# Métodos usados quando a série não tem duas temporadas antes do primeiro fold
+SHORT_METHODS = ('naive', 'snaive')
+
+METHOD_NAMES = {
+    'naive': 'Naive Forecaster (NumPy)',
+    'snaive': 'Seasonal Naive Forecaster (NumPy)',
+    'drift': 'Drift Forecaster (NumPy)',
+    'holt_winters': 'Holt-Winters Aditivo (NumPy)',
+    'theta': 'Theta Forecaster (NumPy)',
+}
+
+
+@dataclass
+class BaselineBacktest:
+    """Previsões por fold (origens x horizonte) de cada método e a tabela de métricas."""
+    origins: np.ndarray
+    actual: np.ndarray
+    predictions: dict
+    scores: pd.DataFrame
+    fold_scores: dict = None
+
+    @property
+    def best_method(self):
+        return self.scores.index[0]
+
+    @property
+    def bar(self):
+        """MASE do melhor modelo base: a marca que os candidatos caros precisam superar."""
+        return float(self.scores['MASE'].iloc[0])
+
+    @property
+    def fold_bar(self):
+        """MASE do melhor modelo base em cada fold, na ordem de ``origins``."""
+        return np.asarray(self.fold_scores[self.best_method]['MASE'], dtype=float)
+
+
+def expanding_origins(n, horizon, n_folds=3, step=None):
+    """Origens (tamanho do treino) de ``n_folds`` janelas expansivas que terminam no fim da série."""
+    step = step or horizon
+    return (n - horizon - step * np.arange(n_folds)[::-1]).astype(np.int64)
+
+
+def fold_actuals(y, origins, horizon):
+    idx = origins[:, None] + np.arange(horizon)
+    inside = idx < len(y)
+    return np.where(inside, y[np.minimum(idx, len(y) - 1)], np.nan)
+
+
+def naive(y, origins, horizon, sp=SEASONAL_PERIOD):
+    return np.repeat(y[origins - 1][:, None], horizon, axis=1)
+
+
+def seasonal_naive(y, origins, horizon, sp=SEASONAL_PERIOD):
+    return y[origins[:, None] - sp + np.arange(horizon) % sp]
+
+
+def drift(y, origins, horizon, sp=SEASONAL_PERIOD):
+    last = y[origins - 1]
+    slope = (last - y[0]) / (origins - 1)
+    return last[:, None] + slope[:, None] * np.arange(1, horizon + 1)
+
+
+def holt_winters(y, origins, horizon, sp=SEASONAL_PERIOD):
+    """Holt-Winters aditivo para toda a grade de parâmetros em uma passada."""
+    alpha, beta, gamma = (g.ravel() for g in np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing='ij'))
+    n_params = alpha.size
+    level = np.full(n_params, y[:sp].mean())
+    trend = np.full(n_params, (y[sp:2 * sp].mean() - y[:sp].mean()) / sp)
+    season = np.tile(y[:sp] - y[:sp].mean(), (n_params, 1))
+    sse = np.zeros(n_params)
+
+    wanted = {int(o): i for i, o in enumerate(origins)}
+    states = [None] * len(origins)
+    for t in range(sp, int(origins.max())):
+        k = t % sp
+        err = y[t] - (level + trend + season[:, k])
+        sse += err ** 2
+        new_level = alpha * (y[t] - season[:, k]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, k] = gamma * (y[t] - new_level) + (1 - gamma) * season[:, k]
+        level = new_level
+        if t + 1 in wanted:
+            # Estado após consumir y[t]: parâmetro com menor SSE até aqui
+            p = int(np.argmin(sse))
+            states[wanted[t + 1]] = (level[p], trend[p], season[p].copy())
+
+    steps = np.arange(horizon)
+    preds = np.empty((len(origins), horizon))
+    for i, (o, state) in enumerate(zip(origins, states)):
+        lv, tr, se = state
+        preds[i] = lv + tr * (steps + 1) + se[(o + steps) % sp]
+    return preds
+
+
+def _seasonal_indices(y, origins, sp):
+    # Índices multiplicativos (origens x sp) pela razão à média móvel centrada 2x12;
+    # cada linha usa só os dados antes da sua origem, por somas acumuladas por posição
+    indices = np.ones((len(origins), sp))
+    if len(y) <= sp:
+        return indices
+    kernel = np.r_[0.5, np.ones(sp - 1), 0.5] / sp
+    ma = np.convolve(y, kernel, mode='valid')
+    offset = sp // 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = y[offset:offset + len(ma)] / ma
+    onehot = (np.arange(len(ma)) + offset) % sp == np.arange(sp)[:, None]
+    cum_w = np.c_[np.zeros(sp), np.cumsum(np.where(onehot, ratios, 0.0), axis=1)]
+    cum_n = np.c_[np.zeros(sp), np.cumsum(onehot, axis=1)]
+    # Razões cuja janela termina antes da origem: as ``origem - sp`` primeiras
+    used = np.clip(origins - sp, 0, len(ma))
+    nonpositive = np.r_[0, np.cumsum(y <= 0)][origins] > 0
+    ok = (origins >= 2 * sp + sp // 2) & ~nonpositive
+    with np.errstate(divide='ignore', invalid='ignore'):
+        found = (cum_w[:, used] / cum_n[:, used]).T
+    indices[ok] = found[ok] / found[ok].mean(axis=1, keepdims=True)
+    return indices
+
+
+def theta(y, origins, horizon, sp=SEASONAL_PERIOD):
+    """Método Theta (SES com metade da tendência linear) sobre a série dessazonalizada.
+
+    A sazonalidade de cada origem é estimada só com os dados anteriores a ela,
+    então cada fold tem a mesma previsão avaliado sozinho ou junto com outros.
+    """
+    indices = _seasonal_indices(y, origins, sp)
+    n = int(origins.max())
+    z = y[:n] / indices[:, np.arange(n) % sp]  # origens x tempo
+
+    # SES para todas as origens e alfas em uma passada, guardando o estado em cada origem
+    rows = np.arange(len(origins))
+    level = np.repeat(z[:, :1], ALPHAS.size, axis=1)
+    sse = np.zeros_like(level)
+    lv_at, sse_at = level.copy(), sse.copy()
+    ends = {}
+    for i, o in enumerate(origins):
+        ends.setdefault(int(o) - 1, []).append(i)
+    for t in range(1, n):
+        err = z[:, t:t + 1] - level
+        sse += err ** 2
+        level = level + ALPHAS * err
+        if t in ends:
+            lv_at[ends[t]], sse_at[ends[t]] = level[ends[t]], sse[ends[t]]
+
+    # Inclinação por mínimos quadrados de z[:o] para cada origem, por somas acumuladas
+    t_idx = np.arange(n, dtype=float)
+    s_t, s_tt = np.r_[0.0, np.cumsum(t_idx)][origins], np.r_[0.0, np.cumsum(t_idx ** 2)][origins]
+    cum = lambda a: np.c_[np.zeros(len(origins)), np.cumsum(a, axis=1)][rows, origins]  # noqa: E731
+    s_z, s_tz = cum(z), cum(t_idx * z)
+    slope = (origins * s_tz - s_t * s_z) / (origins * s_tt - s_t ** 2)
+
+    best = np.argmin(sse_at, axis=1)
+    alpha = ALPHAS[best]
+    lv = lv_at[rows, best]
+    h = np.arange(1, horizon + 1)
+    adj = h[None, :] - 1 + 1 / alpha[:, None] - ((1 - alpha) ** origins / alpha)[:, None]
+    z_pred = lv[:, None] + slope[:, None] / 2 * adj
+    return z_pred * np.take_along_axis(indices, (origins[:, None] + h - 1) % sp, axis=1)
+
+
+METHODS = {
+    'naive': naive,
+    'snaive': seasonal_naive,
+    'drift': drift,
+    'holt_winters': holt_winters,
+    'theta': theta,
+}
+
+
+def backtest_baselines(y, origins, horizon, sp=SEASONAL_PERIOD, methods=None):
+    """Avalia os modelos base em todas as origens e ranqueia pelo MASE médio."""
+    y = np.asarray(y, dtype=float)
+    origins = np.asarray(origins, dtype=np.int64)
+    if origins.min() < 2 * sp:
+        sp = 1  # série curta demais para os métodos sazonais
+    actual = fold_actuals(y, origins, horizon)
+    predictions, fold_scores, rows = {}, {}, []
+    for name in methods or METHODS:
+        preds = METHODS[name](y, origins, horizon, sp)
+        predictions[name] = preds
+        scores = fold_scores[name] = score_folds(actual, preds, y, origins, sp)
+        with warnings.catch_warnings():
+            # R2 fica todo NaN em folds de um passo
+            warnings.simplefilter('ignore', RuntimeWarning)
+            rows.append(dict({'Model': METHOD_NAMES[name]}, **{m: np.nanmean(scores[m]) for m in METRIC_COLUMNS}))
+    table = pd.DataFrame(rows, index=list(predictions)).sort_values('MASE')
+    return BaselineBacktest(origins=origins, actual=actual, predictions=predictions, scores=table,
+                            fold_scores=fold_scores)
+
+
+def experiment_baselines(exp):
+    """Modelos base nos mesmos folds da validação cruzada do experimento PyCaret."""
+    y = exp.get_config('y_train')
+    sp = getattr(exp, 'primary_sp_to_use', None) or 1
+    folds = list(exp.get_config('fold_generator').split(y))
+    origins = np.array([test_idx[0] for _, test_idx in folds])
+    horizon = max(len(test_idx) for _, test_idx in folds)
+    return backtest_baselines(y.to_numpy(dtype=float), origins, horizon, sp=sp)
+
+
+def _future_index(index, fh):
+    last = index[-1]
+    if isinstance(index, pd.PeriodIndex):
+        return pd.period_range(last + 1, periods=fh, freq=index.freq)
+    return pd.period_range(pd.Timestamp(last).to_period('M') + 1, periods=fh, freq='M')
+
+
+def baseline_forecast(y, fh=36, sp=SEASONAL_PERIOD, n_folds=3):
+    """Previsão instantânea com o melhor modelo base (usada enquanto o treino completo roda).
+
+    Em séries curtas os folds que não cabem são descartados, o horizonte do
+    backtest encolhe e só os métodos ingênuos (``SHORT_METHODS``) concorrem.
+    """
+    values = np.asarray(y, dtype=float)
+    if len(values) <= MIN_ORIGIN:
+        raise ValueError(f'Série curta demais para os modelos base: {len(values)} pontos')
+    horizon = max(1, min(fh, sp, len(values) - MIN_ORIGIN))
+    origins = expanding_origins(len(values), horizon, n_folds)
+    origins = origins[origins >= MIN_ORIGIN]
+    methods = None if origins.min() >= 2 * sp else SHORT_METHODS
+    backtest = backtest_baselines(values, origins, horizon, sp=sp, methods=methods)
+    method = backtest.best_method
+    origin = np.array([len(values)])
+    preds = METHODS[method](values, origin, fh, sp if len(values) >= 2 * sp else 1)[0]
+    return pd.Series(preds, index=_future_index(y.index, fh), name='y_pred'), backtest
@@ -0,0 +1,158 @@
+# Previsão em lote de várias séries (segmentos e marcas da planilha da Anfavea)
+import _thread
+import multiprocessing as mp
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .profiling import rss_mb
+
+# Limite padrão de memória residente (MB) de cada processo de treinamento
+MAX_MEMORY_MB = int(os.environ.get('PREVISAO_BATCH_MEMORY_MB', 4096))
+
+# Intervalo (s) entre as leituras da memória residente dos processos do lote
+MEMORY_CHECK_INTERVAL = 1.0
+
+# Variáveis lidas pelas bibliotecas BLAS/OpenMP ao serem carregadas
+THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+               'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+@dataclass
+class BatchResult:
+    """Previsões de todas as séries em formato longo, vencedores e falhas."""
+    predictions: pd.DataFrame
+    winners: pd.DataFrame
+    errors: dict = field(default_factory=dict)
+
+
+@contextmanager
+def _single_threaded():
+    # Um núcleo por série: evita que BLAS/OpenMP disputem os núcleos entre processos.
+    # As bibliotecas leem as variáveis ao serem carregadas, então elas precisam
+    # estar no ambiente antes de cada filho ser criado (o 'spawn' herda o ambiente)
+    saved = {var: os.environ.get(var) for var in THREAD_VARS}
+    os.environ.update(dict.fromkeys(THREAD_VARS, '1'))
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+@contextmanager
+def _memory_guard(max_memory_mb, interval=MEMORY_CHECK_INTERVAL):
+    """Interrompe o bloco com ``MemoryError`` se a memória residente passar de ``max_memory_mb``.
+
+    O limite vale para a RSS, lida a cada ``interval`` segundos por uma thread
+    de vigia; ``RLIMIT_AS`` limitaria a memória virtual, que as bibliotecas
+    numéricas reservam muito além do que usam. Uma chamada longa em C só é
+    interrompida quando devolve o controle ao Python. Sem como ler a RSS
+    (Windows sem ``psutil``), não há limite.
+    """
+    if not max_memory_mb or rss_mb() is None:
+        yield
+        return
+    stop = threading.Event()
+    exceeded = []
+
+    def watch():
+        while not stop.wait(interval):
+            rss = rss_mb()
+            if rss > max_memory_mb and not stop.is_set():
+                exceeded.append(rss)
+                _thread.interrupt_main()
+                return
+
+    watcher = threading.Thread(target=watch, name='previsao-memory-guard', daemon=True)
+    watcher.start()
+    try:
+        yield
+    except KeyboardInterrupt:
+        if not exceeded:
+            raise
+        raise MemoryError(f'Memória residente passou de {max_memory_mb} MB ({exceeded[0]:.0f} MB)') from None
+    finally:
+        stop.set()
+        watcher.join()
+
+
+def _forecast_series(series, session_id, fh, budget, max_memory_mb):
+    # Executado no processo filho; devolve só o necessário (o modelo fica no cache)
+    from .pipeline import run_forecast
+
+    name = series.name
+    data = series.dropna().to_frame(name)
+    with _memory_guard(max_memory_mb):
+        result = run_forecast(data, target=name, session_id=session_id, fh=fh, budget=budget,
+                              parallel=False, n_jobs=1)
+    predictions = result.predictions.iloc[:, 0]
+    long = pd.DataFrame({
+        'serie': name,
+        'periodo': predictions.index.astype(str),
+        'previsao': predictions.to_numpy(dtype=float),
+        'modelo': result.winner_id,
+    })
+    best = result.comparison.iloc[0]
+    return name, long, {'serie': name, 'modelo': result.winner_id, 'nome': best.get('Model'),
+                        'MASE': best.get('MASE')}
+
+
+def numeric_targets(data):
+    return [c for c in data.columns if pd.api.types.is_numeric_dtype(data[c])]
+
+
+def forecast_many(data, targets=None, session_id=123, fh=36, n_jobs=None,
+                  max_memory_mb=MAX_MEMORY_MB, budget=None, progress=None):
+    """Roda setup/compare/finalize/predict para cada coluna de ``data`` em paralelo.
+
+    Cada série é treinada em um processo próprio, com um núcleo (BLAS/OpenMP
+    com uma thread e ``n_jobs=1`` no ``setup``) e a comparação sequencial do
+    PyCaret, para não disputar núcleos com as demais séries; a série cuja
+    memória residente passa de ``max_memory_mb`` falha com ``MemoryError``.
+    A partir do Python 3.11 cada processo é reciclado a cada série (antes
+    disso, a memória de uma série fica no processo até o fim do lote). Os
+    resultados passam pelo cache do pipeline, então séries inalteradas não
+    são retreinadas.
+    """
+    targets = numeric_targets(data) if targets is None else list(targets)
+    n_jobs = n_jobs or os.cpu_count()
+    frames, winners, errors = [], [], {}
+    # ``max_tasks_per_child`` só existe a partir do Python 3.11
+    recycle = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+
+    with _single_threaded(), ProcessPoolExecutor(max_workers=min(n_jobs, len(targets)) or 1,
+                                                 mp_context=mp.get_context('spawn'), **recycle) as executor:
+        futures = {
+            executor.submit(_forecast_series, data[target], session_id, fh, budget, max_memory_mb): target
+            for target in targets
+        }
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                _, long, winner = future.result()
+            except Exception as e:
+                errors[target] = repr(e)
+            else:
+                frames.append(long)
+                winners.append(winner)
+            if progress is not None:
+                progress(target, len(frames) + len(errors), len(targets))
+
+    order = {t: i for i, t in enumerate(targets)}
+    predictions = (
+        pd.concat(frames, ignore_index=True)
+        .sort_values(['serie', 'periodo'], key=lambda s: s.map(order) if s.name == 'serie' else s)
+        .reset_index(drop=True)
+        if frames else pd.DataFrame(columns=['serie', 'periodo', 'previsao', 'modelo'])
+    )
+    winners = pd.DataFrame(winners, columns=['serie', 'modelo', 'nome', 'MASE'])
+    return BatchResult(predictions=predictions, winners=winners, errors=errors)
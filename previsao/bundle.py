@@ -0,0 +1,233 @@
+# Pacotes versionados de artefatos gerados pelo treinamento offline
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from .backtest import BacktestStore
+from .cache import estimate_nbytes, get_cache, hash_dataframe
+from .metrics import METRIC_COLUMNS
+from .pipeline import ForecastResult
+
+# Pasta raiz dos pacotes: <raiz>/<nome da base>/<versão>/
+ARTIFACT_DIR = Path(os.environ.get('PREVISAO_ARTIFACT_DIR', 'artifacts'))
+
+LATEST_FILE = 'LATEST'
+MANIFEST_FILE = 'manifest.json'
+# Índice das versões de cada base (uma linha JSON por versão), lido sem abrir os pacotes
+REGISTRY_FILE = 'registry.jsonl'
+
+# Sem compressão o modelo é carregado com memory map (páginas compartilhadas entre
+# processos); 1-9 troca isso por arquivos menores
+MODEL_COMPRESS = int(os.environ.get('PREVISAO_MODEL_COMPRESS', 0))
+MODEL_FILE = 'model.joblib'
+
+
+def write_bundle(result, data, name, target='AUTOMÓVEIS', fh=36, root=ARTIFACT_DIR):
+    """Grava tabela, modelo, previsões e gráficos em uma nova versão e a marca como a mais recente."""
+    data_hash = hash_dataframe(data)
+    version = time.strftime('%Y%m%dT%H%M%S') + '-' + data_hash[:8]
+    base = Path(root) / name
+    final = base / version
+    tmp = base / f'.{version}.tmp'
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    result.comparison.to_csv(tmp / 'comparison.csv')
+    if result.timings is not None:
+        result.timings.to_csv(tmp / 'timings.csv')
+    if result.baselines is not None:
+        result.baselines.to_csv(tmp / 'baselines.csv')
+    result.predictions.to_csv(tmp / 'predictions.csv')
+    if result.backtest is not None:
+        result.backtest.save(tmp / 'backtest.npz')
+    joblib.dump(result.get_model(), tmp / MODEL_FILE, compress=MODEL_COMPRESS)
+    if result.history is not None:
+        result.history.to_csv(tmp / 'history.csv')
+    if result.residuals is not None:
+        np.save(tmp / 'residuals.npy', np.asarray(result.residuals, dtype=np.float32))
+    (tmp / 'ts_figure.json').write_text(_figure_json(result.ts_figure), encoding='utf-8')
+    (tmp / 'forecast_figure.json').write_text(_figure_json(result.forecast_figure), encoding='utf-8')
+    winner = result.comparison.iloc[0]
+    entry = {
+        'version': version,
+        'name': name,
+        'target': target,
+        'fh': fh,
+        'data_hash': data_hash,
+        'rows': len(data),
+        'last_period': str(data.index[-1]),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'winner_id': result.winner_id,
+        'model_name': winner.get('Model'),
+        'metrics': {m: float(winner[m]) for m in METRIC_COLUMNS if m in winner},
+        'training_seconds': round(sum(r['wall_s'] for r in result.stage_timings or ()), 3),
+        'model_bytes': (tmp / MODEL_FILE).stat().st_size,
+        'model_compress': MODEL_COMPRESS,
+    }
+    manifest = dict(entry, **{
+        'sp': result.sp,
+        'exogenous': result.exogenous,
+        'update_info': result.update_info,
+        'stage_timings': result.stage_timings,
+        'model_repr': result.model_repr or str(result.get_model()),
+    })
+    (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    os.replace(tmp, final)
+    with open(base / REGISTRY_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    pointer = base / f'.{LATEST_FILE}.tmp'
+    pointer.write_text(version, encoding='utf-8')
+    os.replace(pointer, base / LATEST_FILE)
+    return final
+
+
+def _figure_json(figure):
+    # Figuras novas já são dicionários; resultados antigos ainda trazem go.Figure do PyCaret
+    return json.dumps(figure, ensure_ascii=False) if isinstance(figure, dict) else pio.to_json(figure)
+
+
+def latest_bundle(name, root=ARTIFACT_DIR):
+    """Caminho da versão mais recente de ``name``, ou ``None`` se não houver."""
+    try:
+        version = (Path(root) / name / LATEST_FILE).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    path = Path(root) / name / version
+    return path if path.is_dir() else None
+
+
+def _read_predictions(path):
+    predictions = pd.read_csv(path, index_col=0)
+    try:
+        predictions.index = pd.PeriodIndex(predictions.index, freq='M')
+    except (ValueError, TypeError):
+        pass
+    return predictions
+
+
+def _bundle_key(kind, path):
+    # Pacotes são imutáveis: o caminho da versão identifica o conteúdo
+    return f'{kind}-' + hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:16]
+
+
+def load_bundle(path, cache=None):
+    """Carrega um pacote (imutável, por isso memorizado pelo caminho).
+
+    O modelo final não é desserializado aqui: ``result.get_model()`` o carrega
+    quando necessário, evitando importar o PyCaret só para desenhar a página.
+    Os pacotes ficam no cache de resultados (só em memória), dentro do mesmo
+    limite ``PREVISAO_MEMORY_MB``; o tamanho contado inclui o arquivo do
+    modelo, que pode ser carregado depois.
+    """
+    cache = get_cache() if cache is None else cache
+    key = _bundle_key('bundle', path)
+    result = cache.get(key)
+    if result is None:
+        result = _read_bundle(Path(path))
+        model = Path(result.model_path)
+        model_bytes = model.stat().st_size if model.exists() else 0
+        cache.put(key, result, persist=False, nbytes=estimate_nbytes(result) + model_bytes)
+    return result
+
+
+def _read_bundle(path):
+    manifest = json.loads((path / MANIFEST_FILE).read_text(encoding='utf-8'))
+    timings = path / 'timings.csv'
+    baselines = path / 'baselines.csv'
+    backtest = path / 'backtest.npz'
+    history = path / 'history.csv'
+    residuals = path / 'residuals.npy'
+    return ForecastResult(
+        comparison=pd.read_csv(path / 'comparison.csv', index_col=0),
+        final_model=None,
+        model_path=str(path / MODEL_FILE),
+        model_repr=manifest.get('model_repr'),
+        predictions=_read_predictions(path / 'predictions.csv'),
+        ts_figure=json.loads((path / 'ts_figure.json').read_text(encoding='utf-8')),
+        forecast_figure=json.loads((path / 'forecast_figure.json').read_text(encoding='utf-8')),
+        timings=pd.read_csv(timings, index_col=0) if timings.exists() else None,
+        winner_id=manifest['winner_id'],
+        sp=manifest.get('sp', 1),
+        exogenous=manifest.get('exogenous'),
+        update_info=manifest.get('update_info'),
+        stage_timings=manifest.get('stage_timings'),
+        baselines=pd.read_csv(baselines, index_col=0) if baselines.exists() else None,
+        backtest=BacktestStore.load(backtest) if backtest.exists() else None,
+        history=_read_predictions(history).iloc[:, 0] if history.exists() else None,
+        residuals=np.load(residuals) if residuals.exists() else None,
+        version=manifest['version'],
+    )
+
+
+def load_latest_bundle(name, root=ARTIFACT_DIR):
+    path = latest_bundle(name, root=root)
+    return None if path is None else load_bundle(str(path))
+
+
+def write_batch_bundle(batch, data, name, fh=36, root=ARTIFACT_DIR):
+    """Grava as previsões em lote (formato longo) como um pacote ``<name>-series``."""
+    data_hash = hash_dataframe(data)
+    version = time.strftime('%Y%m%dT%H%M%S') + '-' + data_hash[:8]
+    base = Path(root) / f'{name}-series'
+    tmp = base / f'.{version}.tmp'
+    tmp.mkdir(parents=True, exist_ok=True)
+    batch.predictions.to_parquet(tmp / 'predictions.parquet', index=False)
+    batch.winners.to_csv(tmp / 'winners.csv', index=False)
+    manifest = {
+        'version': version,
+        'name': name,
+        'fh': fh,
+        'data_hash': data_hash,
+        'series': list(batch.winners['serie']),
+        'errors': batch.errors,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    final = base / version
+    os.replace(tmp, final)
+    pointer = base / f'.{LATEST_FILE}.tmp'
+    pointer.write_text(version, encoding='utf-8')
+    os.replace(pointer, base / LATEST_FILE)
+    return final
+
+
+def _load_batch(path, cache=None):
+    # Como em ``load_bundle``: memorizado no cache de resultados, dentro do limite de memória
+    cache = get_cache() if cache is None else cache
+    key = _bundle_key('batch', path)
+    batch = cache.get(key)
+    if batch is None:
+        path = Path(path)
+        batch = cache.put(key, (pd.read_parquet(path / 'predictions.parquet'), pd.read_csv(path / 'winners.csv')),
+                          persist=False)
+    return batch
+
+
+def load_latest_batch(name, root=ARTIFACT_DIR):
+    """Previsões em lote mais recentes de ``name`` como ``(previsões, vencedores)``, ou ``None``."""
+    path = latest_bundle(f'{name}-series', root=root)
+    return None if path is None else _load_batch(str(path))
+
+
+def prune_bundles(name, keep=10, root=ARTIFACT_DIR):
+    """Remove as versões mais antigas, mantendo as ``keep`` mais recentes."""
+    base = Path(root) / name
+    versions = sorted(p for p in base.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    removed = {path.name for path in versions[:-keep]}
+    for path in versions[:-keep]:
+        shutil.rmtree(path, ignore_errors=True)
+    index = base / REGISTRY_FILE
+    if removed and index.exists():
+        lines = [line for line in index.read_text(encoding='utf-8').splitlines()
+                 if line and json.loads(line)['version'] not in removed]
+        tmp = index.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+        os.replace(tmp, index)
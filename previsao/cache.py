@@ -0,0 +1,188 @@
+# Cache endereçado por conteúdo para os resultados do pipeline PyCaret
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+# Diretório padrão do cache em disco (pode ser alterado pela variável de ambiente)
+CACHE_DIR = Path(os.environ.get('PREVISAO_CACHE_DIR', Path.home() / '.cache' / 'previsao'))
+
+# Limites padrão de despejo (eviction); a memória é por processo
+MAX_MEMORY_BYTES = int(os.environ.get('PREVISAO_MEMORY_MB', 512)) * 1024 ** 2
+MAX_DISK_BYTES = 2 * 1024 ** 3
+MAX_AGE_SECONDS = 30 * 24 * 3600
+
+
+def hash_dataframe(df):
+    """Calcula um hash estável do conteúdo, índice, colunas e tipos do DataFrame."""
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    h.update(repr([str(c) for c in df.columns]).encode('utf-8'))
+    h.update(repr([str(t) for t in df.dtypes]).encode('utf-8'))
+    return h.hexdigest()
+
+
+class _ByteCounter:
+    # Destino de pickle que só conta os bytes, sem montar o buffer
+    def __init__(self):
+        self.nbytes = 0
+
+    def write(self, data):
+        # No protocolo 5 os arrays grandes chegam como ``PickleBuffer``, sem ``len``
+        self.nbytes += memoryview(data).nbytes
+
+
+def estimate_nbytes(value):
+    """Tamanho aproximado em memória de ``value`` (bytes do pickle sem compressão)."""
+    counter = _ByteCounter()
+    try:
+        pickle.dump(value, counter, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return 0
+    return counter.nbytes
+
+
+def cache_key(df, **params):
+    """Monta a chave do cache a partir do hash dos dados e dos parâmetros do setup."""
+    h = hashlib.sha256(hash_dataframe(df).encode('utf-8'))
+    for name in sorted(params):
+        h.update(f'{name}={params[name]!r};'.encode('utf-8'))
+    return h.hexdigest()[:32]
+
+
+class ResultCache:
+    """Cache em dois níveis (memória e disco) com despejo por tamanho e idade.
+
+    O nível em memória é compartilhado por todas as sessões do processo
+    Streamlit e limitado a ``max_memory_bytes`` pelo tamanho descompactado
+    das entradas; o nível em disco sobrevive a reinícios do servidor.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES,
+                 max_disk_bytes=MAX_DISK_BYTES, max_age=MAX_AGE_SECONDS):
+        self.directory = Path(directory)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self._memory = OrderedDict()  # chave -> (criado_em, tamanho, valor)
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+    def _path(self, key):
+        return self.directory / f'{key}.joblib'
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, size, value = entry
+                if now - created <= self.max_age:
+                    self._memory.move_to_end(key)
+                    return value
+                self._drop_memory(key)
+
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return default
+        if now - stat.st_mtime > self.max_age:
+            path.unlink(missing_ok=True)
+            return default
+        try:
+            value = joblib.load(path)
+        except Exception:
+            # Arquivo corrompido ou de versão incompatível: descarta
+            path.unlink(missing_ok=True)
+            return default
+        os.utime(path, (now, stat.st_mtime))  # atime marca o último acesso
+        size = estimate_nbytes(value)
+        with self._lock:
+            self._put_memory(key, value, size, stat.st_mtime)
+        return value
+
+    def put(self, key, value, persist=True, nbytes=None):
+        """Armazena ``value``; com ``persist=False`` fica apenas na memória.
+
+        ``nbytes`` substitui a estimativa do tamanho em memória, para valores
+        que crescem depois de guardados (ex.: modelo carregado sob demanda).
+        """
+        size = estimate_nbytes(value) if nbytes is None else nbytes
+        if not persist:
+            with self._lock:
+                self._put_memory(key, value, size, time.time())
+            return value
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        joblib.dump(value, tmp, compress=3)
+        os.replace(tmp, path)
+        with self._lock:
+            self._put_memory(key, value, size, time.time())
+        self._evict_disk()
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._path(key).exists()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for path in self.directory.glob('*.joblib'):
+            path.unlink(missing_ok=True)
+
+    def _put_memory(self, key, value, size, created):
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (created, size, value)
+        self._memory_bytes += size
+        # Remove as entradas menos usadas até caber no limite (mantém a mais recente)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            self._drop_memory(next(iter(self._memory)))
+
+    def _drop_memory(self, key):
+        _, size, _ = self._memory.pop(key)
+        self._memory_bytes -= size
+
+    def _evict_disk(self):
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*.joblib'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Retorna a instância de cache compartilhada pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
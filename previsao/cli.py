@@ -0,0 +1,118 @@
+# Linha de comando para o treinamento offline (ex.: cron noturno)
+import argparse
+import sys
+from pathlib import Path
+
+from .batch import MAX_MEMORY_MB, forecast_many
+from .bundle import ARTIFACT_DIR, prune_bundles, write_batch_bundle, write_bundle
+from .data import load_dataset
+from .features import EXOG_DIR, add_regressors, load_regressors
+from .incremental import update_forecast
+from .pipeline import COMPARE_BUDGET, MAX_FH
+from .registry import ModelRegistry
+from .serve import run_server
+from .tuning import TUNE_BUDGET
+
+
+def _train(args):
+    data = load_dataset(args.data, date_column=args.date_column)
+    name = args.name or Path(args.data).stem
+    regressors = load_regressors(args.exog_dir)
+    print(f'Treinando {name} ({len(data)} meses, alvo {args.target}, fh={args.fh}, '
+          f'{len(regressors.columns)} regressores)...')
+    training = add_regressors(data, target=args.target, fh=args.fh, regressors=regressors)
+    result = update_forecast(training, target=args.target, session_id=args.session_id, fh=args.fh,
+                             budget=args.budget, tune_budget=args.tune_budget,
+                             progress=lambda stage: print(f'  etapa: {stage}'))
+    path = write_bundle(result, data, name, target=args.target, fh=args.fh, root=args.out)
+    prune_bundles(name, keep=args.keep, root=args.out)
+    print(f'Modelo vencedor: {result.winner_id}')
+    print(f'Pacote gravado em {path}')
+
+
+def _batch(args):
+    data = load_dataset(args.data, date_column=args.date_column)
+    name = args.name or Path(args.data).stem
+    targets = args.targets.split(',') if args.targets else None
+    batch = forecast_many(data, targets=targets, session_id=args.session_id, fh=args.fh,
+                          n_jobs=args.jobs, max_memory_mb=args.max_memory_mb, budget=args.budget,
+                          progress=lambda target, done, total: print(f'  [{done}/{total}] {target}'))
+    path = write_batch_bundle(batch, data, name, fh=args.fh, root=args.out)
+    prune_bundles(f'{name}-series', keep=args.keep, root=args.out)
+    for target, error in batch.errors.items():
+        print(f'Falha em {target}: {error}', file=sys.stderr)
+    print(f'{len(batch.winners)} séries gravadas em {path}')
+    return 1 if batch.errors else 0
+
+
+def _models(args):
+    models = ModelRegistry(root=args.root).list(args.name)
+    if models.empty:
+        print('Nenhuma versão registrada.')
+        return
+    columns = ['name', 'version', 'latest', 'winner_id', 'MASE', 'training_seconds', 'model_bytes']
+    print(models[[c for c in columns if c in models]].to_string(index=False))
+
+
+def _serve(args):
+    run_server(host=args.host, port=args.port, root=args.root, max_fh=args.max_fh)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m previsao',
+                                     description='Previsão de licenciamentos de automóveis')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train', help='treina e grava um pacote de artefatos')
+    train.add_argument('--data', required=True, help='planilha Excel da Anfavea')
+    train.add_argument('--name', help='nome do pacote (padrão: nome do arquivo)')
+    train.add_argument('--target', default='AUTOMÓVEIS')
+    train.add_argument('--date-column', default='Mês')
+    train.add_argument('--session-id', type=int, default=123)
+    train.add_argument('--fh', type=int, default=36)
+    train.add_argument('--budget', type=float, default=COMPARE_BUDGET,
+                       help='orçamento em segundos da comparação de modelos')
+    train.add_argument('--tune-budget', type=float, default=TUNE_BUDGET,
+                       help='orçamento em segundos do ajuste de hiperparâmetros do vencedor (0 desliga)')
+    train.add_argument('--exog-dir', type=Path, default=EXOG_DIR,
+                       help='pasta com regressores exógenos mensais em CSV/Parquet')
+    train.add_argument('--out', type=Path, default=ARTIFACT_DIR)
+    train.add_argument('--keep', type=int, default=10, help='versões mantidas por pacote')
+    train.set_defaults(func=_train)
+
+    batch = commands.add_parser('batch', help='treina todas as séries da planilha em paralelo')
+    batch.add_argument('--data', required=True, help='planilha Excel da Anfavea')
+    batch.add_argument('--name', help='nome do pacote (padrão: nome do arquivo)')
+    batch.add_argument('--targets', help='colunas separadas por vírgula (padrão: todas as numéricas)')
+    batch.add_argument('--date-column', default='Mês')
+    batch.add_argument('--session-id', type=int, default=123)
+    batch.add_argument('--fh', type=int, default=36)
+    batch.add_argument('--budget', type=float, default=COMPARE_BUDGET)
+    batch.add_argument('--jobs', type=int, help='processos simultâneos (padrão: núcleos)')
+    batch.add_argument('--max-memory-mb', type=int, default=MAX_MEMORY_MB,
+                       help='memória residente máxima de cada processo (0: sem limite)')
+    batch.add_argument('--out', type=Path, default=ARTIFACT_DIR)
+    batch.add_argument('--keep', type=int, default=10)
+    batch.set_defaults(func=_batch)
+
+    models = commands.add_parser('models', help='lista as versões de modelos registradas')
+    models.add_argument('--name', help='base (padrão: todas)')
+    models.add_argument('--root', type=Path, default=ARTIFACT_DIR, help='pasta dos pacotes')
+    models.set_defaults(func=_models)
+
+    server = commands.add_parser('serve', help='serviço HTTP local com as previsões')
+    server.add_argument('--host', default='127.0.0.1')
+    server.add_argument('--port', type=int, default=8502)
+    server.add_argument('--root', type=Path, default=ARTIFACT_DIR, help='pasta dos pacotes')
+    server.add_argument('--max-fh', type=int, default=MAX_FH, help='maior horizonte aceito (meses)')
+    server.set_defaults(func=_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# Comparação de modelos em paralelo, com orçamento de tempo e poda antecipada
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .metrics import METRIC_COLUMNS, score_all
+
+# Candidatos cujo MASE parcial passa deste múltiplo do líder são descartados
+PRUNE_FACTOR = 1.5
+
+
+@dataclass
+class ComparisonResult:
+    """Tabela ranqueada (mesmo formato de ``s.pull()``) e tempos por modelo."""
+    table: pd.DataFrame
+    timings: pd.DataFrame
+    fold_predictions: dict = field(default_factory=dict)
+    fold_mase: dict = field(default_factory=dict)
+
+    @property
+    def best_id(self):
+        return self.table.index[0]
+
+
+def _score_fold(model_id, fold, estimator, y, train_idx, test_idx, sp, X=None):
+    # Executado nos processos do pool: ajusta um clone do estimador em um fold
+    from sklearn.base import clone
+    from sktime.forecasting.base import ForecastingHorizon
+
+    start = time.perf_counter()
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+    X_train, X_test = (None, None) if X is None else (X.iloc[train_idx], X.iloc[test_idx])
+    model = clone(estimator)
+    model.fit(y_train, X=X_train)
+    y_pred = model.predict(ForecastingHorizon(y_test.index, is_relative=False), X=X_test)
+    scores = score_all(y_test.values, y_pred.values, y_train.values, sp)
+    return model_id, fold, scores, time.perf_counter() - start, np.asarray(y_pred.values, dtype=float)
+
+
+def _terminate(executor):
+    # Encerra os processos do pool: ajustes já iniciados não seguem ocupando os núcleos
+    # depois do orçamento (``terminate_workers`` só existe a partir do Python 3.14)
+    terminate = getattr(executor, 'terminate_workers', None)
+    if terminate is not None:
+        terminate()
+        executor.shutdown(wait=True)
+        return
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=5)
+
+
+def candidate_models(exp, include=None, exclude=('ensemble_forecaster',), turbo=True):
+    """Estimadores candidatos do experimento, como em ``compare_models``."""
+    from pycaret.containers.models.time_series import get_all_model_containers
+
+    containers = get_all_model_containers(exp)
+    if include is None:
+        include = [k for k, c in containers.items() if not turbo or getattr(c, 'is_turbo', True)]
+    return {
+        model_id: (containers[model_id].name, containers[model_id].class_def(**containers[model_id].args))
+        for model_id in include
+        if model_id in containers and model_id not in exclude
+    }
+
+
+def _prune(scores, status, n_folds, prune_factor=PRUNE_FACTOR, min_folds=1, bar=None):
+    """Poda os candidatos muito piores que a referência nos mesmos folds.
+
+    A referência de um candidato é o menor MASE médio, sobre os folds que ele
+    já concluiu, entre ``bar`` (MASE por fold) e os demais candidatos que já
+    concluíram esses folds. O último candidato ativo nunca é podado.
+    """
+    active = {m: {f: s['MASE'] for f, s in done.items()} for m, done in scores.items() if status[m] == 'ok'}
+    ratios = {}
+    for model_id, done in active.items():
+        if len(done) < min_folds or len(done) == n_folds:
+            continue
+        keys = list(done)
+        refs = [np.mean([other[f] for f in keys]) for other_id, other in active.items()
+                if other_id != model_id and all(f in other for f in keys)]
+        if bar is not None:
+            refs.append(np.mean(bar[keys]))
+        refs = [r for r in refs if np.isfinite(r)]
+        if refs:
+            ratios[model_id] = np.mean(list(done.values())) / min(refs)
+    pruned = {m for m, ratio in ratios.items() if ratio > prune_factor}
+    if pruned and len(pruned) == len(active):
+        # Um fold difícil para todos não encerra a comparação: o mais próximo da referência segue
+        pruned.discard(min(pruned, key=ratios.get))
+    for model_id in pruned:
+        status[model_id] = 'podado'
+
+
+def parallel_compare(exp, include=None, budget=None, prune_factor=PRUNE_FACTOR, min_folds=1,
+                     n_jobs=None, candidates=None, bar=None):
+    """Avalia os candidatos em todos os folds usando todos os núcleos.
+
+    Os pares (modelo, fold) são distribuídos em um pool de processos, fold a
+    fold, para que o MASE parcial de cada modelo fique disponível cedo. Um
+    candidato é podado quando, depois de ``min_folds`` folds, seu MASE médio
+    passa de ``prune_factor`` vezes o do líder nos mesmos folds. ``budget``
+    limita o tempo total em segundos; modelos que não completam todos os folds
+    ficam fora do ranking e aparecem apenas na tabela de tempos, e os ajustes
+    ainda em andamento quando o orçamento acaba são interrompidos. ``bar`` (por
+    exemplo o MASE dos modelos base em NumPy, um valor ou um por fold) vale
+    como líder desde o primeiro fold.
+    """
+    y = exp.get_config('y_train')
+    X = exp.get_config('X_train')  # regressores exógenos (None sem regressores)
+    sp = getattr(exp, 'primary_sp_to_use', None) or 1
+    folds = list(exp.get_config('fold_generator').split(y))
+    candidates = candidate_models(exp, include=include) if candidates is None else candidates
+
+    start = time.perf_counter()
+    deadline = None if budget is None else start + budget
+    bar = None if bar is None else np.broadcast_to(np.asarray(bar, dtype=float), (len(folds),))
+    scores = {model_id: {} for model_id in candidates}  # fold -> métricas
+    elapsed = {model_id: 0.0 for model_id in candidates}
+    preds = {model_id: {} for model_id in candidates}
+    status = {model_id: 'ok' for model_id in candidates}
+    tasks = {}
+    pending = set()
+
+    executor = ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count())
+    try:
+        for fold, (train_idx, test_idx) in enumerate(folds):
+            for model_id, (_, estimator) in candidates.items():
+                future = executor.submit(_score_fold, model_id, fold, estimator, y, train_idx, test_idx, sp, X)
+                tasks[future] = model_id
+
+        pending = set(tasks)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # orçamento esgotado
+            for future in done:
+                model_id = tasks[future]
+                if status[model_id] != 'ok' or future.cancelled():
+                    continue
+                try:
+                    _, fold, fold_scores, seconds, y_pred = future.result()
+                except Exception:
+                    status[model_id] = 'erro'
+                    continue
+                scores[model_id][fold] = fold_scores
+                elapsed[model_id] += seconds
+                preds[model_id][fold] = y_pred
+
+            _prune(scores, status, len(folds), prune_factor, min_folds, bar)
+            for future in list(pending):
+                if status[tasks[future]] != 'ok' and future.cancel():
+                    pending.discard(future)
+    finally:
+        # Nos dois casos os processos são aguardados: a CPU deles entra na etapa do profiler
+        if pending:
+            _terminate(executor)
+        else:
+            executor.shutdown(wait=True)
+
+    rows, timing_rows = [], []
+    for model_id, (name, _) in candidates.items():
+        n_done = len(scores[model_id])
+        if status[model_id] == 'ok' and n_done < len(folds):
+            status[model_id] = 'tempo esgotado'
+        timing_rows.append({'Model': name, 'Folds': n_done, 'TT (Sec)': round(elapsed[model_id], 4),
+                            'Status': status[model_id]})
+        if status[model_id] == 'ok':
+            row = {'Model': name}
+            row.update({m: np.mean([s[m] for s in scores[model_id].values()]) for m in METRIC_COLUMNS})
+            row['TT (Sec)'] = round(elapsed[model_id] / n_done, 4)
+            rows.append(row)
+    if not rows:
+        raise RuntimeError('Nenhum modelo completou a validação cruzada dentro do orçamento de tempo.')
+
+    index = [m for m in candidates if status[m] == 'ok']
+    table = pd.DataFrame(rows, index=index).sort_values('MASE')
+    timings = pd.DataFrame(timing_rows, index=list(candidates))
+    fold_predictions = {
+        model_id: [(folds[fold][1], preds[model_id][fold]) for fold in sorted(preds[model_id])]
+        for model_id in table.index
+    }
+    fold_mase = {
+        model_id: np.array([scores[model_id][fold]['MASE'] for fold in range(len(folds))])
+        for model_id in table.index
+    }
+    return ComparisonResult(table=table, timings=timings, fold_predictions=fold_predictions,
+                            fold_mase=fold_mase)
@@ -0,0 +1,109 @@
+# Leitura das bases da Anfavea com snapshot colunar (Parquet/Arrow) em cache
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .cache import CACHE_DIR
+
+# Pasta das planilhas (no Windows, C:\Tablets; nos servidores, via variável de ambiente)
+DATA_DIR = Path(os.environ.get('PREVISAO_DATA_DIR', r'C:\Tablets'))
+SNAPSHOT_DIR = Path(os.environ.get('PREVISAO_SNAPSHOT_DIR', CACHE_DIR / 'snapshots'))
+
+_META_KEY = b'previsao_source'
+
+
+def data_path(name):
+    """Caminho de um arquivo dentro de ``DATA_DIR``."""
+    return DATA_DIR / name
+
+
+def file_sha256(path, chunk_size=1024 ** 2):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def compact_dtypes(df):
+    """Reduz inteiros ao menor tipo e floats a float32 quando não há perda."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            small = series.astype(np.float32)
+            if np.array_equal(small.astype(np.float64).values, series.values, equal_nan=True):
+                df[column] = small
+    return df
+
+
+def _read_excel(path, date_column):
+    data = pd.read_excel(path)
+    data[date_column] = pd.to_datetime(data[date_column])
+    data.set_index(date_column, inplace=True)
+    return compact_dtypes(data)
+
+
+def _snapshot_path(path, snapshot_dir):
+    digest = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:12]
+    return Path(snapshot_dir) / f'{path.stem}-{digest}.parquet'
+
+
+def _snapshot_meta(snapshot):
+    try:
+        metadata = pq.read_schema(snapshot).metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid, OSError):
+        return None
+    raw = metadata.get(_META_KEY)
+    return json.loads(raw) if raw else None
+
+
+def _write_snapshot(data, snapshot, source_meta):
+    table = pa.Table.from_pandas(data, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_META_KEY] = json.dumps(source_meta).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snapshot.with_suffix(f'.{os.getpid()}.tmp')
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, snapshot)
+
+
+def load_dataset(path, date_column='Mês', snapshot_dir=SNAPSHOT_DIR):
+    """Carrega a planilha com índice de datas, usando o snapshot Parquet quando válido.
+
+    A primeira leitura converte o Excel em um snapshot com tipos compactos. O
+    snapshot é invalidado quando a data de modificação e o tamanho do arquivo
+    mudam e o hash do conteúdo também mudou; nas demais leituras o Parquet é
+    lido com memory map, sem passar pelo openpyxl.
+    """
+    path = Path(path)
+    stat = path.stat()
+    snapshot = _snapshot_path(path, snapshot_dir)
+    meta = _snapshot_meta(snapshot)
+    current = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    if meta is not None and meta.get('date_column') == date_column:
+        unchanged = meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+        if not unchanged:
+            # Arquivo tocado (cópia, sincronização): só reconverte se o conteúdo mudou
+            sha256 = file_sha256(path)
+            unchanged = meta.get('sha256') == sha256
+            if unchanged:
+                data = pq.read_table(snapshot, memory_map=True).to_pandas()
+                _write_snapshot(data, snapshot, dict(meta, **current))
+                return data
+        if unchanged:
+            return pq.read_table(snapshot, memory_map=True).to_pandas()
+
+    data = _read_excel(path, date_column)
+    _write_snapshot(data, snapshot, dict(current, sha256=file_sha256(path), date_column=date_column))
+    return data
@@ -0,0 +1,171 @@
+# Regressores exógenos mensais (Selic, IPCA, crédito...) e repositório de atributos
+#
+# Cada arquivo CSV/Parquet em ``EXOG_DIR`` traz uma coluna de datas e uma ou
+# mais séries. Os atributos (valor, defasagens e médias móveis) de cada série
+# ficam gravados em Parquet; quando a série muda só no fim (um mês novo, uma
+# revisão recente), apenas as últimas linhas são recalculadas.
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .cache import CACHE_DIR
+from .data import DATA_DIR
+
+EXOG_DIR = Path(os.environ.get('PREVISAO_EXOG_DIR', DATA_DIR / 'exogenas'))
+FEATURE_DIR = Path(os.environ.get('PREVISAO_FEATURE_DIR', CACHE_DIR / 'features'))
+
+LAGS = (1, 3, 12)
+WINDOWS = (3, 12)
+
+_META_KEY = b'previsao_features'
+
+
+def read_regressor(path, date_column=None):
+    """Lê um arquivo de regressores como médias mensais (índice no início de cada mês)."""
+    path = Path(path)
+    frame = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+    date_column = date_column or frame.columns[0]
+    frame[date_column] = pd.to_datetime(frame[date_column])
+    frame = frame.set_index(date_column).select_dtypes('number')
+    return frame.resample('MS').mean()
+
+
+def load_regressors(directory=EXOG_DIR, date_column=None):
+    """Junta todos os regressores de ``directory`` (vazio se a pasta não existir)."""
+    directory = Path(directory)
+    files = sorted(p for p in directory.glob('*') if p.suffix in ('.csv', '.parquet')) if directory.is_dir() else []
+    if not files:
+        return pd.DataFrame()
+    return pd.concat([read_regressor(p, date_column) for p in files], axis=1).sort_index()
+
+
+def compute_features(raw, lags=LAGS, windows=WINDOWS):
+    """Valor, defasagens e médias móveis de uma série de regressor."""
+    name = raw.name
+    columns = {name: raw}
+    columns.update({f'{name}_lag{k}': raw.shift(k) for k in lags})
+    columns.update({f'{name}_media{w}': raw.rolling(w, min_periods=1).mean() for w in windows})
+    return pd.DataFrame(columns, index=raw.index).astype(np.float32)
+
+
+class FeatureStore:
+    """Atributos dos regressores gravados em Parquet e atualizados de forma incremental."""
+
+    def __init__(self, directory=FEATURE_DIR, lags=LAGS, windows=WINDOWS):
+        self.directory = Path(directory)
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+
+    @property
+    def context(self):
+        # Linhas anteriores necessárias para recalcular a primeira linha alterada
+        return max(self.lags + self.windows)
+
+    def _path(self, name):
+        digest = hashlib.sha1(str(name).encode('utf-8')).hexdigest()[:12]
+        return self.directory / f'{digest}.parquet'
+
+    def _read(self, name):
+        path = self._path(name)
+        try:
+            table = pq.read_table(path, memory_map=True)
+        except (FileNotFoundError, pa.ArrowInvalid, OSError):
+            return None
+        meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b'{}'))
+        if meta.get('lags') != list(self.lags) or meta.get('windows') != list(self.windows):
+            return None
+        return table.to_pandas()
+
+    def _write(self, name, features):
+        table = pa.Table.from_pandas(features, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_META_KEY] = json.dumps({'name': str(name), 'lags': list(self.lags),
+                                          'windows': list(self.windows)}).encode('utf-8')
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        pq.write_table(table.replace_schema_metadata(metadata), tmp, compression='zstd')
+        os.replace(tmp, path)
+
+    def features(self, raw):
+        """Atributos de ``raw``, recalculando só a partir do primeiro mês que mudou."""
+        raw = raw.astype(np.float32)
+        cached = self._read(raw.name)
+        start = 0
+        if cached is not None and len(cached):
+            n = min(len(cached), len(raw))
+            same = (cached.index[:n] == raw.index[:n]) & np.isclose(
+                cached[raw.name].to_numpy()[:n], raw.to_numpy()[:n], equal_nan=True)
+            start = n if same.all() else int(np.argmin(same))
+            if start == len(raw) == len(cached):
+                return cached
+        begin = max(0, start - self.context)
+        tail = compute_features(raw.iloc[begin:], self.lags, self.windows).iloc[start - begin:]
+        features = tail if start == 0 else pd.concat([cached.iloc[:start], tail])
+        self._write(raw.name, features)
+        return features
+
+
+def _months(index):
+    # Mês de cada data (o índice pode usar o início ou o fim do mês)
+    return index if isinstance(index, pd.PeriodIndex) else pd.DatetimeIndex(index).to_period('M')
+
+
+def _future_dates(index, months):
+    # Datas dos meses futuros no mesmo padrão do índice (período, início ou fim do mês)
+    if isinstance(index, pd.PeriodIndex):
+        return months
+    if (pd.DatetimeIndex(index).day == 1).all():
+        return months.to_timestamp()
+    return months.to_timestamp(how='end').normalize()
+
+
+def add_regressors(data, target='AUTOMÓVEIS', fh=36, regressors=None, store=None):
+    """Acrescenta a ``data`` os atributos dos regressores e ``fh`` linhas futuras.
+
+    As linhas futuras têm o alvo vazio e trazem os regressores que o
+    ``predict_model`` precisa; meses sem valor nos arquivos (inclusive o
+    futuro não informado) repetem o último valor conhecido. Nada é preenchido
+    para trás: o histórico começa no primeiro mês com todos os atributos
+    observados (início dos arquivos mais a maior defasagem), para que nenhum
+    mês de treino leve valores posteriores a ele. Sem regressores, ``data`` é
+    devolvido sem alteração. Os dois lados são alinhados pelo mês, seja qual
+    for o dia usado nas datas de ``data``.
+    """
+    regressors = load_regressors() if regressors is None else regressors
+    if regressors.empty:
+        return data
+    store = FeatureStore() if store is None else store
+    index = data.index
+    months = _months(index)
+    future = pd.period_range(months[-1] + 1, periods=fh, freq='M')
+    full_months = months.append(future)
+    regressors = regressors.set_axis(_months(regressors.index).to_timestamp())
+    span = pd.date_range(min(regressors.index[0], full_months[0].to_timestamp()),
+                         full_months[-1].to_timestamp(), freq='MS')
+    columns = [store.features(regressors[name].reindex(span).ffill().rename(name))
+               for name in regressors.columns]
+    features = pd.concat(columns, axis=1).reindex(full_months.to_timestamp()).ffill()
+    observed = features.notna().all(axis=1).to_numpy()
+    first = int(np.argmax(observed))
+    if not observed[first] or first >= len(index):
+        raise ValueError('Os regressores não cobrem nenhum mês do histórico de '
+                         f'{target!r} (com defasagens de até {max(store.lags)} meses)')
+    full_index = index.append(_future_dates(index, future))
+    frame = data[[target]].reindex(full_index)
+    return frame.join(features.set_axis(full_index)).iloc[first:]
+
+
+def split_exogenous(data, target):
+    """Separa o histórico (alvo preenchido) dos regressores das linhas futuras (``None`` se não houver)."""
+    if len(data.columns) == 1:
+        return data, None
+    known = data[target].notna().to_numpy()
+    future = data.loc[~known].drop(columns=target)
+    return data.loc[known], (future if len(future) else None)
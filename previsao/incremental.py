@@ -0,0 +1,126 @@
+# Atualização mensal incremental: reaproveita o modelo vencedor quando só chegam meses novos
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import get_cache
+from .metrics import mase
+from .pipeline import COMPARE_BUDGET, forecast_key, refit_forecast, train_forecast
+from .profiling import append_jsonl
+from .tuning import TUNE_BUDGET
+
+# Piora máxima aceita do MASE nos meses novos em relação ao do backtest no mesmo horizonte
+DRIFT_THRESHOLD = 1.25
+
+
+@dataclass
+class TrainingState:
+    """Série e resultado do último treinamento completo ou incremental de um alvo."""
+    index: pd.Index
+    values: np.ndarray
+    result_key: str
+    winner_id: str
+    cv_mase: float
+
+
+def state_key(target, session_id, fh):
+    params = f'state;{target};{session_id};{fh}'.encode('utf-8')
+    return 'state-' + hashlib.sha256(params).hexdigest()[:24]
+
+
+def is_extension(state, y):
+    """Verifica se ``y`` só acrescenta observações ao final da série do estado."""
+    n = len(state.values)
+    return (
+        len(y) > n
+        and y.index[:n].equals(state.index)
+        and np.array_equal(y.values[:n], state.values)
+    )
+
+
+def _previous_forecast(result, k):
+    # Previsões do modelo anterior para os k meses que chegaram; com regressores
+    # exógenos só há previsão até o horizonte do treinamento
+    if result.exogenous:
+        k = min(k, len(result.predictions))
+    return np.asarray(result.forecast(k), dtype=float)
+
+
+def update_forecast(data, target='AUTOMÓVEIS', session_id=123, fh=36, progress=None,
+                    budget=COMPARE_BUDGET, drift_threshold=DRIFT_THRESHOLD, cache=None,
+                    tune_budget=TUNE_BUDGET):
+    """Treina de forma incremental quando possível e completa quando necessário.
+
+    Se ``data`` estende a última série treinada para o mesmo alvo, os meses
+    novos são avaliados com a previsão que o modelo anterior já havia feito
+    (um fold fora da amostra, sem custo de treino). A referência é o MASE do
+    vencedor no backtest nos mesmos passos à frente; sem folds que cubram
+    esses passos, só o primeiro mês novo é comparado ao MASE de um passo da
+    validação cruzada. Se a razão não passar de ``drift_threshold``, o
+    vencedor anterior é apenas reajustado na série estendida e a tabela de
+    comparação é mantida (com os hiperparâmetros já ajustados); caso
+    contrário roda a comparação completa.
+    """
+    cache = get_cache() if cache is None else cache
+    key = forecast_key(data, target=target, session_id=session_id, fh=fh, budget=budget,
+                       tune_budget=tune_budget)
+    skey = state_key(target, session_id, fh)
+    y = data[target].dropna()  # sem as linhas futuras dos regressores exógenos
+
+    result = None
+    state = cache.get(skey)
+    previous = cache.get(state.result_key) if state is not None and is_extension(state, y) else None
+    if previous is not None:
+        new_points = y.to_numpy(dtype=float)[len(state.values):]
+        origin = len(state.values)
+        store = None
+        # A validação cruzada do PyCaret é de um passo: sem outra referência, só o primeiro mês novo conta
+        steps, reference = 1, state.cv_mase
+        if previous.backtest is not None:
+            # O fold da previsão final anterior ganha os valores reais dos meses novos
+            store = previous.backtest.copy()
+            store.extend(y)
+            horizon_mase = store.horizon_mase(previous.winner_id, len(new_points), before=origin)
+            if np.isfinite(horizon_mase):
+                steps, reference = min(len(new_points), store.horizon), horizon_mase
+            new_mase = store.scores(previous.winner_id, steps=steps).loc[origin, 'MASE']
+        else:
+            y_pred = _previous_forecast(previous, steps)
+            new_mase = mase(new_points[:steps], y_pred, state.values, previous.sp)
+        drift = new_mase / reference if reference else np.inf
+        update_info = {
+            'new_points': len(new_points),
+            'steps': steps,
+            'mase_new': float(new_mase),
+            'mase_ref': float(reference),
+            'mase_cv': float(state.cv_mase),
+            'drift': float(drift),
+        }
+        if drift <= drift_threshold:
+            result = refit_forecast(data, state.winner_id, previous.comparison, target=target,
+                                    session_id=session_id, fh=fh, timings=previous.timings,
+                                    progress=progress, store=store,
+                                    params=previous.tuning.params if previous.tuning else None)
+            result.update_info = dict(update_info, mode='incremental')
+            result.baselines = previous.baselines
+            result.tuning = previous.tuning
+            cv_mase = state.cv_mase
+
+    if result is None:
+        result = train_forecast(data, target=target, session_id=session_id, fh=fh,
+                                progress=progress, budget=budget, tune_budget=tune_budget)
+        if previous is not None:
+            result.update_info = dict(update_info, mode='completo (drift acima do limite)')
+        cv_mase = float(result.comparison['MASE'].iloc[0])
+
+    try:
+        # Tempos do treinamento gravados uma vez, quando o resultado é produzido
+        append_jsonl([dict(record, origem='treinamento') for record in result.stage_timings or ()])
+    except OSError:
+        pass  # as métricas de desempenho não impedem o treinamento
+    cache.put(key, result)
+    cache.put(skey, TrainingState(index=y.index, values=y.to_numpy(), result_key=key,
+                                  winner_id=result.winner_id, cv_mase=cv_mase))
+    return result
@@ -0,0 +1,101 @@
+# Métricas de previsão no mesmo padrão da tabela do PyCaret (MASE, RMSSE, MAE, ...)
+import warnings
+
+import numpy as np
+
+# Ordem das colunas de métricas em ``s.pull()`` depois de ``compare_models``
+METRIC_COLUMNS = ('MASE', 'RMSSE', 'MAE', 'RMSE', 'MAPE', 'SMAPE', 'R2')
+
+
+def _scale(y_train, sp, power):
+    # Erro do modelo ingênuo sazonal dentro da amostra de treino
+    y_train = np.asarray(y_train, dtype=float)
+    sp = sp if len(y_train) > sp else 1
+    diff = np.abs(y_train[sp:] - y_train[:-sp]) ** power
+    return np.mean(diff)
+
+
+def mase(y_true, y_pred, y_train, sp=1):
+    return np.mean(np.abs(np.asarray(y_true) - np.asarray(y_pred))) / _scale(y_train, sp, 1)
+
+
+def rmsse(y_true, y_pred, y_train, sp=1):
+    mse = np.mean((np.asarray(y_true) - np.asarray(y_pred)) ** 2)
+    return np.sqrt(mse / _scale(y_train, sp, 2))
+
+
+def mae(y_true, y_pred):
+    return np.mean(np.abs(np.asarray(y_true) - np.asarray(y_pred)))
+
+
+def rmse(y_true, y_pred):
+    return np.sqrt(np.mean((np.asarray(y_true) - np.asarray(y_pred)) ** 2))
+
+
+def mape(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=float)
+    return np.mean(np.abs((y_true - np.asarray(y_pred)) / y_true))
+
+
+def smape(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    return np.mean(2 * np.abs(y_pred - y_true) / (np.abs(y_true) + np.abs(y_pred)))
+
+
+def r2(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=float)
+    if len(y_true) < 2:
+        return np.nan
+    ss_res = np.sum((y_true - np.asarray(y_pred)) ** 2)
+    ss_tot = np.sum((y_true - y_true.mean()) ** 2)
+    return 1 - ss_res / ss_tot if ss_tot else np.nan
+
+
+def score_all(y_true, y_pred, y_train, sp=1):
+    """Calcula todas as métricas de ``METRIC_COLUMNS`` para um fold."""
+    return {
+        'MASE': mase(y_true, y_pred, y_train, sp),
+        'RMSSE': rmsse(y_true, y_pred, y_train, sp),
+        'MAE': mae(y_true, y_pred),
+        'RMSE': rmse(y_true, y_pred),
+        'MAPE': mape(y_true, y_pred),
+        'SMAPE': smape(y_true, y_pred),
+        'R2': r2(y_true, y_pred),
+    }
+
+
+def _fold_scales(y, origins, sp, power):
+    # Escala do MASE/RMSSE de cada fold (ingênuo sazonal em y[:origem]) por somas acumuladas
+    y = np.asarray(y, dtype=float)
+    diffs = np.abs(y[sp:] - y[:-sp]) ** power
+    cum = np.r_[0.0, np.cumsum(diffs)]
+    counts = np.asarray(origins) - sp
+    return cum[counts] / counts
+
+
+def score_folds(actual, pred, y, origins, sp=1):
+    """Métricas por fold, vetorizadas sobre matrizes (folds x horizonte).
+
+    ``actual`` usa NaN nos passos ainda sem valor observado; esses passos são
+    ignorados. Retorna um dicionário métrica -> vetor com um valor por fold.
+    """
+    actual = np.asarray(actual, dtype=float)
+    err = np.asarray(pred, dtype=float) - actual
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        abs_err = np.abs(err)
+        mae_f = np.nanmean(abs_err, axis=1)
+        mse_f = np.nanmean(err ** 2, axis=1)
+        n_valid = np.sum(~np.isnan(actual), axis=1)
+        ss_tot = np.nansum((actual - np.nanmean(actual, axis=1, keepdims=True)) ** 2, axis=1)
+        ss_res = np.nansum(err ** 2, axis=1)
+        return {
+            'MASE': mae_f / _fold_scales(y, origins, sp, 1),
+            'RMSSE': np.sqrt(mse_f / _fold_scales(y, origins, sp, 2)),
+            'MAE': mae_f,
+            'RMSE': np.sqrt(mse_f),
+            'MAPE': np.nanmean(abs_err / np.abs(actual), axis=1),
+            'SMAPE': np.nanmean(2 * abs_err / (np.abs(actual) + np.abs(actual + err)), axis=1),
+            'R2': np.where((n_valid >= 2) & (ss_tot > 0), 1 - ss_res / np.where(ss_tot > 0, ss_tot, 1), np.nan),
+        }
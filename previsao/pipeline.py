@@ -0,0 +1,290 @@
+# Pipeline setup -> compare -> finalize -> predict do PyCaret
+import gc
+import os
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .backtest import BacktestStore
+from .baselines import METHODS as BASELINE_METHODS
+from .baselines import experiment_baselines
+from .cache import cache_key, get_cache
+from .compare import parallel_compare
+from .features import split_exogenous
+from .plots import forecast_figure as build_forecast_figure
+from .plots import ts_figure as build_ts_figure
+from .profiling import Profiler
+from .scenarios import relative_residuals
+from .tuning import TUNE_BUDGET, TuningResult, build_estimator, cached_tuning
+
+# Etapas do treinamento, na ordem em que são executadas
+STAGES = ('setup', 'compare', 'tune', 'finalize', 'predict')
+
+# Orçamento padrão (segundos) da comparação paralela; vazio = sem limite
+COMPARE_BUDGET = float(os.environ.get('PREVISAO_COMPARE_BUDGET', 0)) or None
+
+# Maior horizonte (meses) aceito em ``ForecastResult.forecast`` e no serviço
+MAX_FH = int(os.environ.get('PREVISAO_MAX_FH', 120))
+
+
+def check_horizon(fh, max_fh=MAX_FH):
+    """Valida o horizonte pedido: inteiro de 1 a ``max_fh`` meses (senão ``ValueError``)."""
+    fh = int(fh)
+    if not 1 <= fh <= max_fh:
+        raise ValueError(f'Horizonte inválido: {fh} (use de 1 a {max_fh} meses)')
+    return fh
+
+
+@dataclass
+class ForecastResult:
+    """Artefatos de um treinamento usados pela página."""
+    comparison: pd.DataFrame
+    final_model: object
+    predictions: pd.DataFrame
+    ts_figure: object
+    forecast_figure: object
+    timings: pd.DataFrame = None
+    winner_id: str = None
+    sp: int = 1
+    update_info: dict = None
+    stage_timings: list = None
+    baselines: pd.DataFrame = None
+    backtest: BacktestStore = None
+    history: pd.Series = None
+    residuals: np.ndarray = None
+    tuning: TuningResult = None
+    exogenous: list = None
+    version: str = None
+    model_path: str = None
+    model_repr: str = None
+
+    def get_model(self):
+        """Modelo final; em pacotes é carregado do disco só quando pedido.
+
+        Arquivos sem compressão são mapeados em memória (cópia na escrita): os
+        arrays do modelo não são lidos de uma vez e as páginas são compartilhadas
+        entre os processos que carregam a mesma versão.
+        """
+        if self.final_model is None and self.model_path is not None:
+            with warnings.catch_warnings():
+                # Pacotes compactados não podem ser mapeados; o joblib avisa e lê normalmente
+                warnings.simplefilter('ignore', UserWarning)
+                self.final_model = joblib.load(self.model_path, mmap_mode='c')
+        return self.final_model
+
+    def forecast(self, fh, max_fh=MAX_FH):
+        """Previsão de ``fh`` meses: a já calculada ou, além dela, a do modelo final.
+
+        ``fh`` fora de 1 a ``max_fh`` levanta ``ValueError``. Modelos com
+        regressores exógenos precisam dos valores futuros deles, que só existem
+        para o horizonte do treinamento; além dele também levanta ``ValueError``.
+        """
+        fh = check_horizon(fh, max_fh)
+        if fh <= len(self.predictions):
+            return self.predictions.iloc[:fh, 0]
+        if self.exogenous:
+            raise ValueError(f'O modelo usa regressores exógenos ({", ".join(self.exogenous)}) e só '
+                             f'tem previsão para {len(self.predictions)} meses')
+        return self.get_model().predict(fh=np.arange(1, fh + 1))
+
+    def describe_model(self):
+        """Descrição do modelo final sem precisar carregá-lo (nem importar o PyCaret)."""
+        return self.model_repr if self.final_model is None else self.final_model
+
+    def compact(self):
+        """Guarda histórico e resíduos em float32 (contagens mensais cabem sem perda)."""
+        if self.history is not None:
+            self.history = self.history.astype('float32')
+        if self.residuals is not None:
+            self.residuals = np.asarray(self.residuals, dtype=np.float32)
+        return self
+
+
+def _experiment():
+    # Importação tardia: o PyCaret (sktime, statsmodels, catboost...) só é
+    # carregado quando um treinamento realmente precisa rodar
+    from pycaret.time_series import TSForecastingExperiment
+    return TSForecastingExperiment()
+
+
+def release_candidates(exp):
+    """Descarta os modelos ajustados e tabelas que o experimento acumula.
+
+    Depois da comparação só interessam a tabela (já lida com ``pull``) e o
+    vencedor; os demais candidatos ajustados ficariam presos ao experimento.
+    """
+    for name in ('_master_model_container', '_display_container'):
+        container = getattr(exp, name, None)
+        if isinstance(container, list):
+            container.clear()
+
+
+@contextmanager
+def managed_experiment():
+    """Experimento que é liberado ao sair do bloco, com os candidatos e as cópias dos dados.
+
+    Só o ``ForecastResult`` (modelo final, previsões e tabela) sobrevive ao
+    treinamento; o experimento não fica preso ao processo ou à sessão.
+    """
+    s = _experiment()
+    try:
+        yield s
+    finally:
+        release_candidates(s)
+        gc.collect()
+
+
+def forecast_key(data, target='AUTOMÓVEIS', session_id=123, fh=36, budget=COMPARE_BUDGET, parallel=True,
+                 tune_budget=TUNE_BUDGET):
+    """Chave de cache de um treinamento com estes dados e parâmetros."""
+    params = dict(target=target, session_id=session_id, fh=fh, budget=budget, parallel=parallel)
+    if tune_budget:
+        params['tune_budget'] = tune_budget
+    return cache_key(data, **params)
+
+
+def train_forecast(data, target='AUTOMÓVEIS', session_id=123, fh=36, progress=None,
+                   budget=COMPARE_BUDGET, parallel=True, tune_budget=TUNE_BUDGET, n_jobs=-1):
+    """Executa o fluxo completo do PyCaret e devolve os artefatos da página.
+
+    ``progress``, se informado, é chamado com o nome de cada etapa de ``STAGES``.
+    Com ``parallel=True`` a comparação usa ``parallel_compare`` (todos os
+    núcleos, orçamento ``budget`` e poda), tendo como marca inicial o MASE dos
+    modelos base em NumPy nos mesmos folds; senão usa ``s.compare_models()``.
+    Com ``tune_budget`` o vencedor passa por ``tune_winner`` (memorizado por
+    versão dos dados) antes da finalização. Colunas além do alvo (ver
+    ``previsao.features.add_regressors``) entram como regressores exógenos.
+    ``n_jobs`` é repassado ao ``setup`` (1 nos lotes, que já usam um processo
+    por série).
+    """
+    report = progress or (lambda stage: None)
+    profiler = Profiler()
+    data, future_X = split_exogenous(data, target)
+    with managed_experiment() as s:
+        report('setup')
+        with profiler.stage(target, 'setup'):
+            s.setup(data=data, target=target, session_id=session_id, n_jobs=n_jobs, verbose=False)
+        report('compare')
+        timings = fold_mase = None
+        store = BacktestStore(data[target], horizon=fh, sp=getattr(s, 'primary_sp_to_use', None) or 1)
+        with profiler.stage(target, 'baselines'):
+            baselines = experiment_baselines(s)
+        with profiler.stage(target, 'compare_models'):
+            if parallel:
+                # Marca por fold: cada candidato é comparado aos modelos base nos folds que já concluiu
+                compared = parallel_compare(s, budget=budget, bar=baselines.fold_bar)
+                comparison, timings = compared.table, compared.timings
+                fold_mase = compared.fold_mase[compared.best_id]
+                # Previsões dos folds da comparação ficam no backtest sem custo extra
+                for model_id, folds in compared.fold_predictions.items():
+                    for test_idx, y_pred in folds:
+                        store.add_fold(model_id, int(test_idx[0]), y_pred)
+                best = s.create_model(compared.best_id, cross_validation=False, verbose=False)
+            else:
+                best = s.compare_models(verbose=False)
+                comparison = s.pull()
+                release_candidates(s)
+        tuning = None
+        if tune_budget:
+            report('tune')
+            with profiler.stage(target, 'tune_model'):
+                tuning = cached_tuning(s, data, target, session_id, comparison.index[0],
+                                       float(comparison['MASE'].iloc[0]), budget=tune_budget,
+                                       fold_mase=fold_mase)
+                if tuning.improved:
+                    tuned = build_estimator(s, tuning.model_id, tuning.params)
+                    best = s.create_model(tuned, cross_validation=False, verbose=False)
+        result = complete_forecast(s, best, comparison, fh=fh, timings=timings, progress=report,
+                                   profiler=profiler, section=target, store=store, X=future_X)
+    result.baselines = baselines.scores
+    result.tuning = tuning
+    return result
+
+
+def refit_forecast(data, winner_id, comparison, target='AUTOMÓVEIS', session_id=123, fh=36,
+                   timings=None, progress=None, store=None, params=None):
+    """Reajusta um modelo já escolhido sobre novos dados, sem rodar a comparação.
+
+    ``store``, se informado, é o backtest do treinamento anterior já estendido
+    com os meses novos; recebe a nova previsão final como mais um fold.
+    ``params`` são os hiperparâmetros ajustados anteriormente, se houver.
+    """
+    report = progress or (lambda stage: None)
+    profiler = Profiler()
+    data, future_X = split_exogenous(data, target)
+    with managed_experiment() as s:
+        report('setup')
+        with profiler.stage(target, 'setup'):
+            s.setup(data=data, target=target, session_id=session_id, verbose=False)
+        report('compare')
+        with profiler.stage(target, 'create_model'):
+            estimator = build_estimator(s, winner_id, params) if params else winner_id
+            best = s.create_model(estimator, cross_validation=False, verbose=False)
+        return complete_forecast(s, best, comparison, fh=fh, timings=timings, progress=report,
+                                 profiler=profiler, section=target, store=store, X=future_X)
+
+
+def complete_forecast(s, best, comparison, fh=36, timings=None, progress=None, profiler=None,
+                      section='pipeline', store=None, X=None):
+    """Finalização, previsão e gráficos a partir do modelo escolhido.
+
+    Os gráficos são montados pelo ``previsao.plots`` a partir da série e das
+    previsões, sem o ``plot_model`` do PyCaret (que refaz o ajuste e gera
+    figuras pesadas). ``X`` são os regressores exógenos dos ``fh`` meses futuros.
+    """
+    report = progress or (lambda stage: None)
+    profiler = profiler or Profiler()
+    history = s.get_config('y')
+    report('finalize')
+    with profiler.stage(section, 'finalize_model'):
+        final_best = s.finalize_model(best)
+    report('predict')
+    with profiler.stage(section, 'predict_model'):
+        predictions = s.predict_model(final_best, fh=fh, X=X)
+    with profiler.stage(section, 'residuals'):
+        # Resíduos dentro da amostra, base dos cenários Monte Carlo da página
+        residuals = relative_residuals(final_best, history)
+    with profiler.stage(section, 'plot'):
+        ts_figure = build_ts_figure(history)
+        forecast_figure = build_forecast_figure(history, predictions)
+    if store is not None:
+        with profiler.stage(section, 'backtest'):
+            # A previsão final vira um fold cujo valor real chega mês a mês
+            store.add_fold(comparison.index[0], len(store.y), predictions.iloc[:, 0])
+            for name, forecaster in BASELINE_METHODS.items():
+                store.run(name, forecaster)
+    return ForecastResult(
+        comparison=comparison,
+        final_model=final_best,
+        predictions=predictions,
+        ts_figure=ts_figure,
+        forecast_figure=forecast_figure,
+        timings=timings,
+        winner_id=comparison.index[0],
+        sp=getattr(s, 'primary_sp_to_use', None) or 1,
+        stage_timings=profiler.records,
+        model_repr=str(final_best),
+        backtest=store,
+        history=history,
+        residuals=residuals,
+        exogenous=None if X is None else [str(c) for c in X.columns],
+    ).compact()
+
+
+def run_forecast(data, target='AUTOMÓVEIS', session_id=123, fh=36, cache=None,
+                 budget=COMPARE_BUDGET, parallel=True, n_jobs=-1):
+    """Retorna o resultado do cache ou treina e armazena quando os dados mudam.
+
+    ``n_jobs`` só define os núcleos do treino; não muda o resultado nem a chave do cache.
+    """
+    cache = get_cache() if cache is None else cache
+    key = forecast_key(data, target=target, session_id=session_id, fh=fh, budget=budget, parallel=parallel)
+    result = cache.get(key)
+    if result is None:
+        result = cache.put(key, train_forecast(data, target=target, session_id=session_id, fh=fh,
+                                               budget=budget, parallel=parallel, n_jobs=n_jobs))
+    return result
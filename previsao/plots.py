@@ -0,0 +1,135 @@
+# Gráficos leves da série e da previsão, montados a partir das previsões já calculadas
+#
+# Em vez de reconstruir as figuras pelo ``plot_model`` do PyCaret a cada
+# interação, as figuras são especificações Plotly em dicionário (sem validação
+# nem objetos ``go.Figure``), com a série histórica reduzida a ``MAX_POINTS``
+# pontos e memorizadas por versão do modelo.
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .cache import hash_dataframe
+
+# Número máximo de pontos do histórico enviados ao navegador
+MAX_POINTS = int(os.environ.get('PREVISAO_PLOT_POINTS', 600))
+SPEC_CACHE_SIZE = 64
+
+HISTORY_COLOR = '#1f77b4'
+FORECAST_COLOR = '#d62728'
+
+
+def downsample(values, max_points=MAX_POINTS):
+    """Índices dos pontos mantidos: primeiro, último e mínimo/máximo de cada faixa.
+
+    Preserva picos e vales (importantes em séries de emplacamento) com no
+    máximo ``max_points`` pontos; séries menores são devolvidas inteiras.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    n_buckets = max(1, (max_points - 2) // 2)
+    inner = np.arange(1, n - 1)
+    bucket = np.minimum((inner - 1) * n_buckets // (n - 2), n_buckets - 1)
+    # Ordena por faixa e valor: o primeiro de cada faixa é o mínimo e o último o máximo
+    order = inner[np.lexsort((values[inner], bucket))]
+    sorted_bucket = bucket[order - 1]
+    first = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+    last = np.r_[sorted_bucket[1:] != sorted_bucket[:-1], True]
+    return np.unique(np.r_[0, order[first], order[last], n - 1])
+
+
+def _labels(index):
+    if isinstance(index, pd.PeriodIndex):
+        return index.strftime('%Y-%m').tolist()
+    if isinstance(index, pd.DatetimeIndex):
+        return index.strftime('%Y-%m-%d').tolist()
+    return [str(i) for i in index]
+
+
+def _trace(index, values, name, color, dash=None):
+    line = {'color': color, 'width': 1.5}
+    if dash:
+        line['dash'] = dash
+    return {
+        'type': 'scatter',
+        'mode': 'lines',
+        'name': name,
+        'x': _labels(index),
+        'y': np.round(np.asarray(values, dtype=float), 1).tolist(),
+        'line': line,
+    }
+
+
+def _layout(title):
+    return {
+        'title': {'text': title},
+        'margin': {'l': 40, 'r': 10, 't': 40, 'b': 30},
+        'hovermode': 'x unified',
+        'legend': {'orientation': 'h', 'y': -0.15},
+    }
+
+
+def ts_figure(y, max_points=MAX_POINTS, title=None):
+    """Série histórica do alvo (reduzida para o navegador)."""
+    keep = downsample(y, max_points)
+    name = y.name or 'y'
+    return {'data': [_trace(y.index[keep], y.to_numpy()[keep], name, HISTORY_COLOR)],
+            'layout': _layout(title or f'Série temporal - {name}')}
+
+
+def forecast_figure(y, predictions, max_points=MAX_POINTS, title=None):
+    """Histórico reduzido seguido da previsão completa (com intervalos, se houver)."""
+    keep = downsample(y, max_points)
+    forecast = predictions.iloc[:, 0]
+    data = [
+        _trace(y.index[keep], y.to_numpy()[keep], 'Real', HISTORY_COLOR),
+        _trace(forecast.index, forecast.to_numpy(), 'Previsão', FORECAST_COLOR, dash='dash'),
+    ]
+    if {'lower', 'upper'} <= set(predictions.columns):
+        band = _trace(forecast.index.append(forecast.index[::-1]),
+                      np.r_[predictions['upper'].to_numpy(), predictions['lower'].to_numpy()[::-1]],
+                      'Intervalo', FORECAST_COLOR)
+        band.update(fill='toself', opacity=0.2, line={'width': 0}, hoverinfo='skip')
+        data.append(band)
+    return {'data': data, 'layout': _layout(title or f'Previsão - {len(forecast)} períodos')}
+
+
+def _version(result):
+    return result.version or f'{result.winner_id}-{hash_dataframe(result.predictions)[:16]}'
+
+
+def _build(result, kind, max_points):
+    if result.history is None:
+        # Resultados antigos sem histórico: usa a figura gravada no treinamento
+        return result.ts_figure if kind == 'ts' else result.forecast_figure
+    if kind == 'ts':
+        return ts_figure(result.history, max_points)
+    return forecast_figure(result.history, result.predictions, max_points)
+
+
+_specs = OrderedDict()
+_specs_lock = threading.Lock()
+
+
+def figure_spec(result, kind='forecast', max_points=MAX_POINTS):
+    """Figura ``'ts'`` ou ``'forecast'`` de um resultado, memorizada por versão do modelo."""
+    if kind not in ('ts', 'forecast'):
+        raise ValueError(f'Tipo de gráfico desconhecido: {kind!r}')
+    key = (_version(result), kind, max_points)
+    with _specs_lock:
+        spec = _specs.get(key)
+        if spec is not None:
+            _specs.move_to_end(key)
+            return spec
+    # Montada fora do lock; se outra sessão montou a mesma figura antes, vale a dela
+    spec = _build(result, kind, max_points)
+    with _specs_lock:
+        spec = _specs.setdefault(key, spec)
+        _specs.move_to_end(key)
+        while len(_specs) > SPEC_CACHE_SIZE:
+            _specs.popitem(last=False)
+    return spec
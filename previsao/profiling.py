@@ -0,0 +1,251 @@
+# Medição de tempo e memória por etapa do pipeline, com exportação JSON-lines e Prometheus
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import CACHE_DIR
+
+PROFILE_DIR = Path(os.environ.get('PREVISAO_PROFILE_DIR', CACHE_DIR / 'profile'))
+JSONL_FILE = 'stages.jsonl'
+PROM_FILE = 'previsao.prom'
+
+
+# Maior pico de RSS lido antes de cada reinício do pico em /proc/self/clear_refs
+_lifetime_peak_mb = 0.0
+# Picos parciais das etapas em andamento (listas de um elemento), atualizados a cada reinício
+_open_peaks = []
+_peak_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo desde o seu início, em MB (``None`` se indisponível).
+
+    É o máximo acumulado do processo (``ru_maxrss``), não o pico de uma etapa:
+    só cresce quando uma etapa passa do maior valor já atingido.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 ** 2
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    peak = peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+    # O reinício do pico de cada etapa também zera o ru_maxrss no Linux
+    return max(peak, _lifetime_peak_mb)
+
+
+def children_cpu_s():
+    """CPU (usuário + sistema) dos processos filhos já encerrados e aguardados, em segundos.
+
+    Os pools de ``parallel_compare`` são aguardados antes do fim da etapa,
+    então a CPU dos filhos entra na etapa que os criou. No Windows (sem
+    ``resource``) devolve 0: lá o ``cpu_s`` das etapas é só o do processo.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _read_hwm_mb():
+    # Pico de RSS desde o último reinício (VmHWM de /proc/self/status, em kB)
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+@contextmanager
+def stage_peak_rss():
+    """Mede o pico de RSS do processo durante o bloco; ``box[0]`` fica ``None`` fora do Linux.
+
+    No início o pico do kernel é reiniciado (``5`` em ``/proc/self/clear_refs``)
+    e no fim lê-se o ``VmHWM``. Etapas aninhadas recebem o pico lido antes de
+    cada reinício. O pico é do processo inteiro: etapas simultâneas em outras
+    threads entram na conta.
+    """
+    global _lifetime_peak_mb
+    box = [None]
+    with _peak_lock:
+        current = _read_hwm_mb()
+        if current is not None:
+            try:
+                with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+                    f.write('5')
+            except OSError:
+                current = None
+        if current is not None:
+            _lifetime_peak_mb = max(_lifetime_peak_mb, current)
+            for other in _open_peaks:
+                other[0] = max(other[0], current)
+            box[0] = 0.0
+            _open_peaks.append(box)
+    try:
+        yield box
+    finally:
+        if box[0] is not None:
+            with _peak_lock:
+                _open_peaks[:] = [other for other in _open_peaks if other is not box]
+                box[0] = max(box[0], _read_hwm_mb() or 0.0)
+
+
+def rss_mb():
+    """Memória residente atual do processo, em MB (``None`` se indisponível)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        # Linux sem psutil: segundo campo de /proc/self/statm, em páginas
+        with open('/proc/self/statm', encoding='ascii') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def process_uptime():
+    """Segundos desde o início do processo atual (``None`` se indisponível)."""
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except ImportError:
+        pass
+    try:
+        # Linux sem psutil: 22º campo de /proc/self/stat, em ticks desde o boot
+        with open('/proc/self/stat', encoding='ascii') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', encoding='ascii') as f:
+            boot_uptime = float(f.read().split()[0])
+        return boot_uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+_cold_start_recorded = False
+
+
+def record_cold_start(profiler, section='app'):
+    """Na primeira execução da página no processo, registra o tempo desde o início do processo."""
+    global _cold_start_recorded
+    if _cold_start_recorded:
+        return None
+    _cold_start_recorded = True
+    uptime = process_uptime()
+    if uptime is not None:
+        profiler.record(section, 'cold_start', uptime, time.process_time(), peak_rss_mb())
+    return uptime
+
+
+def append_jsonl(records, path=None):
+    """Acrescenta ``records`` ao arquivo JSON-lines das etapas."""
+    path = Path(path or PROFILE_DIR / JSONL_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records or ():
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+class Profiler:
+    """Registra tempo de parede, tempo de CPU e picos de RSS de cada etapa.
+
+    ``cpu_s`` soma a CPU do processo e a dos filhos aguardados durante a etapa
+    (``children_cpu_s``, também gravado à parte). ``stage_peak_rss_mb`` é o
+    pico da etapa (só no Linux; ``None`` nos demais sistemas) e
+    ``process_max_rss_mb`` o pico do processo desde o início.
+    """
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+
+    @contextmanager
+    def stage(self, section, name):
+        wall, cpu, children = time.perf_counter(), time.process_time(), children_cpu_s()
+        peak = [None]
+        try:
+            with stage_peak_rss() as peak:
+                yield
+        finally:
+            children = children_cpu_s() - children
+            self.record(section, name, time.perf_counter() - wall, time.process_time() - cpu + children,
+                        peak_rss_mb(), stage_peak=peak[0], children_cpu_s=round(children, 6))
+
+    def record(self, section, name, wall_s, cpu_s, max_rss=None, stage_peak=None, **extra):
+        self.records.append(dict({
+            'run': self.run_id,
+            'timestamp': time.time(),
+            'section': section,
+            'stage': name,
+            'wall_s': round(wall_s, 6),
+            'cpu_s': round(cpu_s, 6),
+            'stage_peak_rss_mb': None if stage_peak is None else round(stage_peak, 1),
+            'process_max_rss_mb': None if max_rss is None else round(max_rss, 1),
+        }, **extra))
+
+    def extend(self, records, **extra):
+        """Acrescenta registros de outro processo (ex.: o worker de treinamento)."""
+        for record in records or ():
+            self.records.append(dict(record, run=self.run_id, **extra))
+
+    def to_frame(self):
+        return pd.DataFrame(self.records)
+
+    def write_jsonl(self, path=None, records=None):
+        """Acrescenta os registros (ou só ``records``) ao arquivo JSON-lines."""
+        return append_jsonl(self.records if records is None else records, path)
+
+    def write_prometheus(self, path=None):
+        """Grava um textfile para o node_exporter (a última medição de cada etapa)."""
+        path = Path(path or PROFILE_DIR / PROM_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        latest = {}
+        for record in self.records:
+            latest[(record['section'], record['stage'])] = record
+        metrics = (
+            ('previsao_stage_wall_seconds', 'wall_s', 'Tempo de parede da etapa'),
+            ('previsao_stage_cpu_seconds', 'cpu_s',
+             'Tempo de CPU da etapa, do processo e dos filhos aguardados (só do processo no Windows)'),
+            ('previsao_stage_children_cpu_seconds', 'children_cpu_s', 'Tempo de CPU dos processos filhos da etapa'),
+            ('previsao_stage_peak_rss_megabytes', 'stage_peak_rss_mb',
+             'Pico de RSS do processo durante a etapa (só no Linux)'),
+            ('previsao_process_max_rss_megabytes', 'process_max_rss_mb',
+             'Pico de RSS do processo desde o início, lido ao fim da etapa'),
+        )
+        lines = []
+        for metric, field, help_text in metrics:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for (section, stage), record in sorted(latest.items()):
+                if record.get(field) is None:
+                    continue
+                labels = f'section="{_escape(section)}",stage="{_escape(stage)}"'
+                lines.append(f'{metric}{{{labels}}} {record[field]}')
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        os.replace(tmp, path)
+        return path
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,49 @@
+# Registro local das versões de modelos gravadas pelo treinamento offline
+#
+# Cada base tem um índice ``registry.jsonl`` (uma linha por versão, escrito por
+# ``write_bundle``): listar as versões lê só esses índices, sem abrir pacotes
+# nem desserializar modelos.
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from .bundle import ARTIFACT_DIR, LATEST_FILE, REGISTRY_FILE, latest_bundle, load_bundle
+
+
+class ModelRegistry:
+    """Lista e carrega versões de modelos em ``<raiz>/<base>/<versão>/``."""
+
+    def __init__(self, root=ARTIFACT_DIR):
+        self.root = Path(root)
+
+    def entries(self, name=None):
+        rows = []
+        for index in sorted(self.root.glob(f'{name or "*"}/{REGISTRY_FILE}')):
+            latest = index.parent / LATEST_FILE
+            current = latest.read_text(encoding='utf-8').strip() if latest.exists() else None
+            for line in index.read_text(encoding='utf-8').splitlines():
+                if line:
+                    entry = json.loads(line)
+                    entry['latest'] = entry['version'] == current
+                    rows.append(entry)
+        return rows
+
+    def list(self, name=None):
+        """Versões registradas com métricas do vencedor, tempo de treino e tamanho do modelo."""
+        rows = [dict(entry, **entry.pop('metrics', {})) for entry in self.entries(name)]
+        return pd.DataFrame(rows)
+
+    def path(self, name, version=None):
+        path = latest_bundle(name, root=self.root) if version is None else self.root / name / version
+        if path is None or not path.is_dir():
+            raise KeyError(f'Versão {version or LATEST_FILE!r} de {name!r} não encontrada')
+        return path
+
+    def load(self, name, version=None):
+        """``ForecastResult`` da versão (a mais recente por padrão); o modelo só é lido quando usado."""
+        return load_bundle(str(self.path(name, version)))
+
+    def load_model(self, name, version=None):
+        """Modelo final da versão, pronto para ``predict`` sem novo ajuste."""
+        return self.load(name, version).get_model()
@@ -0,0 +1,66 @@
+# Texto de análise das métricas do modelo vencedor, montado a partir do treinamento
+import numpy as np
+
+
+def _pct(value):
+    return f'{value:.4f} (ou {value * 100:.2f}%)'
+
+
+def results_analysis(result):
+    """Análise em Markdown das métricas do vencedor em ``result.comparison``.
+
+    Os valores saem da validação cruzada do treinamento carregado (e, quando
+    houver, do melhor modelo base nos mesmos folds), então o texto acompanha
+    cada novo treino em vez de repetir números de uma execução antiga.
+    """
+    row = result.comparison.iloc[0]
+    name = row['Model']
+    mase, rmsse = row['MASE'], row['RMSSE']
+    mae, rmse = row['MAE'], row['RMSE']
+    mape, smape = row['MAPE'], row['SMAPE']
+    seconds = row['TT (Sec)']
+
+    lines = [
+        f'Métricas do modelo **{name}** ({result.winner_id}), vencedor da comparação, '
+        f'entre {len(result.comparison)} candidatos ranqueados por MASE na validação cruzada do treinamento.',
+        '',
+        '### 1. **MASE (Mean Absolute Scaled Error)**',
+        f'   - **Valor**: {mase:.4f}',
+        '   - **Interpretação**: compara o erro absoluto médio do modelo com o do modelo ingênuo sazonal '
+        'no treino. Abaixo de 1, o modelo erra menos que a referência.',
+        '   - **Análise**: ' + (f'o modelo erra {(1 - mase) * 100:.0f}% menos que a referência.' if mase < 1
+                              else 'o modelo não supera a referência ingênua.'),
+        '',
+        '### 2. **RMSSE (Root Mean Squared Scaled Error)**',
+        f'   - **Valor**: {rmsse:.4f}',
+        '   - **Interpretação**: como o MASE, mas sobre o erro quadrático, o que pesa mais os erros grandes.',
+        '',
+        '### 3. **MAE e RMSE**',
+        f'   - **Valores**: MAE {mae:,.4f} e RMSE {rmse:,.4f}',
+        '   - **Interpretação**: erros na unidade da série (automóveis por mês); dependem da escala dos dados.',
+    ]
+    if np.isclose(mae, rmse):
+        lines.append('   - **Análise**: MAE e RMSE coincidem porque cada fold da validação prevê um único mês; '
+                     'a diferença entre eles só aparece em horizontes mais longos.')
+    lines += [
+        '',
+        '### 4. **MAPE e SMAPE**',
+        f'   - **Valores**: MAPE {_pct(mape)} e SMAPE {_pct(smape)}',
+        '   - **Análise**: ' + ('erro percentual abaixo de 5%, normalmente considerado muito bom.' if mape < 0.05
+                              else 'erro percentual abaixo de 10%, considerado bom.' if mape < 0.10
+                              else 'erro percentual acima de 10%.'),
+        '',
+        '### 5. **TT (Tempo Total em Segundos)**',
+        f'   - **Valor**: {seconds:.4f} segundos por fold (ajuste e previsão)',
+    ]
+    baselines = result.baselines
+    if baselines is not None and len(baselines):
+        best = baselines.sort_values('MASE').iloc[0]
+        lines += [
+            '',
+            '### Comparação com os modelos base',
+            f"O melhor modelo base nos mesmos folds, **{best['Model']}**, teve MASE {best['MASE']:.4f}; "
+            + (f'o vencedor reduz o erro em {(1 - mase / best["MASE"]) * 100:.0f}%.' if mase < best['MASE']
+               else 'o vencedor não supera esse modelo base.'),
+        ]
+    return '\n'.join(lines) + '\n'
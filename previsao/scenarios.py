@@ -0,0 +1,146 @@
+# Cenários Monte Carlo da previsão: intervalos mensais e totais anuais
+#
+# Os caminhos são a previsão pontual do modelo final multiplicada por
+# sequências de erros relativos reamostradas em blocos (bootstrap de blocos
+# móveis), o que preserva a autocorrelação e a sazonalidade dos resíduos. O
+# erro cresce com o horizonte conforme o observado no backtest do vencedor.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+N_PATHS = 5000
+CHUNK_PATHS = 1000
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+@dataclass
+class ScenarioSummary:
+    """Quantis mensais e anuais dos caminhos simulados."""
+    monthly: pd.DataFrame
+    annual: pd.DataFrame
+    n_paths: int
+
+
+def relative_residuals(model, y):
+    """Resíduos relativos dentro da amostra do modelo final (``None`` se o modelo não os fornece)."""
+    try:
+        residuals = np.asarray(model.predict_residuals(), dtype=float).ravel()
+    except Exception:
+        return None
+    fitted = np.asarray(y, dtype=float)[-len(residuals):] - residuals
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = residuals / fitted
+    relative = relative[np.isfinite(relative)]
+    return relative if len(relative) else None
+
+
+def backtest_errors(store, model):
+    """Erros relativos dos folds do backtest (folds x horizonte, NaN sem valor real)."""
+    if store is None or model not in store.predictions:
+        return None
+    preds = store.predictions[model].astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        errors = store.actual() / preds - 1
+    errors[~np.isfinite(errors)] = np.nan
+    return errors[~np.isnan(errors).all(axis=1)]
+
+
+def horizon_scale(errors, horizon, pool_std):
+    """Fator de crescimento do erro por passo: desvio do backtest no passo h sobre o dos resíduos."""
+    scale = np.ones(horizon)
+    if errors is None or not len(errors) or not pool_std:
+        return scale
+    with np.errstate(invalid='ignore'):
+        step_std = np.sqrt(np.nanmean(errors[:, :horizon] ** 2, axis=0))
+    step_std = np.where(np.isfinite(step_std), step_std, np.nan)
+    if np.isnan(step_std).all():
+        return scale
+    # Passos sem fold herdam o último valor conhecido; o erro não diminui com o horizonte
+    step_std = pd.Series(step_std).ffill().bfill().to_numpy()
+    scale[:len(step_std)] = np.maximum.accumulate(np.maximum(step_std / pool_std, 1.0))
+    scale[len(step_std):] = scale[len(step_std) - 1]
+    return scale
+
+
+def simulate_paths(point, residuals, n_paths=N_PATHS, block=12, scale=None, seed=123,
+                   chunk=CHUNK_PATHS):
+    """Caminhos (n_paths x horizonte, float32) por bootstrap de blocos móveis dos resíduos.
+
+    Os caminhos são gerados em lotes de ``chunk`` para limitar a memória
+    intermediária dos índices de reamostragem.
+    """
+    point = np.asarray(point, dtype=np.float64)
+    residuals = np.asarray(residuals, dtype=np.float64)
+    horizon = len(point)
+    block = max(1, min(block, len(residuals)))
+    n_blocks = -(-horizon // block)
+    starts_max = len(residuals) - block + 1
+    scale = np.ones(horizon) if scale is None else np.asarray(scale, dtype=np.float64)
+    offsets = np.arange(block)
+    rng = np.random.default_rng(seed)
+    paths = np.empty((n_paths, horizon), dtype=np.float32)
+    for lo in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - lo)
+        starts = rng.integers(0, starts_max, size=(size, n_blocks))
+        idx = (starts[:, :, None] + offsets).reshape(size, -1)[:, :horizon]
+        paths[lo:lo + size] = point * (1 + residuals[idx] * scale)
+    return np.maximum(paths, 0, out=paths)
+
+
+def _years(index):
+    if isinstance(index, pd.PeriodIndex):
+        return np.asarray(index.year)
+    return np.asarray(pd.DatetimeIndex(index).year)
+
+
+def summarize(paths, point, index, history=None, quantiles=QUANTILES):
+    """Quantis por mês e totais por ano (anos completos somando o já observado)."""
+    labels = [f'p{round(q * 100):02d}' for q in quantiles]
+    monthly = pd.DataFrame(np.quantile(paths, quantiles, axis=0).T, index=index, columns=labels)
+    monthly.insert(0, 'previsao', np.asarray(point, dtype=float))
+
+    years = _years(index)
+    obs_sum = obs_n = pd.Series(dtype=float)
+    if history is not None:
+        grouped = pd.Series(np.asarray(history, dtype=float)).groupby(_years(history.index))
+        obs_sum, obs_n = grouped.sum(), grouped.size()
+    rows = {}
+    for year in np.unique(years):
+        cols = years == year
+        observed = float(obs_sum.get(year, 0.0))
+        if obs_n.get(year, 0) + cols.sum() < 12:
+            continue  # ano incompleto no horizonte
+        totals = observed + paths[:, cols].sum(axis=1, dtype=np.float64)
+        rows[int(year)] = dict(previsao=observed + float(np.asarray(point)[cols].sum()),
+                               observado=observed, **dict(zip(labels, np.quantile(totals, quantiles))))
+    annual = pd.DataFrame.from_dict(rows, orient='index', columns=['previsao', 'observado', *labels])
+
+    # Variação sobre o ano anterior: o realizado se o ano está completo, senão a previsão
+    previous = dict(obs_sum[obs_n == 12]) if len(obs_n) else {}
+    for year, total in annual['previsao'].items():
+        previous.setdefault(year, total)
+    base = np.array([previous.get(year - 1, np.nan) for year in annual.index], dtype=float)
+    annual['variacao_pct'] = (annual['previsao'].to_numpy() / base - 1) * 100
+    return monthly, annual
+
+
+def simulate_scenarios(result, n_paths=N_PATHS, seed=123, quantiles=QUANTILES, chunk=CHUNK_PATHS):
+    """Cenários do resultado de um treinamento a partir dos resíduos guardados com ele.
+
+    Usa os resíduos dentro da amostra do modelo final; se não existirem, os
+    erros do backtest do vencedor. Retorna ``None`` se não houver nenhum dos dois.
+    """
+    point = result.predictions.iloc[:, 0]
+    errors = backtest_errors(result.backtest, result.winner_id)
+    residuals = result.residuals
+    if residuals is None and errors is not None:
+        residuals = errors[np.isfinite(errors)]
+    if residuals is None or len(residuals) < 2:
+        return None
+    residuals = np.asarray(residuals, dtype=float)
+    scale = horizon_scale(errors, len(point), float(np.sqrt(np.mean(residuals ** 2))))
+    paths = simulate_paths(point.to_numpy(), residuals, n_paths=n_paths, block=result.sp or 12,
+                           scale=scale, seed=seed, chunk=chunk)
+    monthly, annual = summarize(paths, point.to_numpy(), point.index, result.history, quantiles)
+    return ScenarioSummary(monthly=monthly, annual=annual, n_paths=n_paths)
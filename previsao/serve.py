@@ -0,0 +1,136 @@
+# Serviço HTTP local com as previsões dos modelos finalizados
+import functools
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .bundle import ARTIFACT_DIR, LATEST_FILE, latest_bundle, load_bundle, load_latest_batch
+from .pipeline import MAX_FH, check_horizon
+
+DEFAULT_NAME = 'Automoveis_2000_2024'
+CACHE_SIZE = 256
+
+
+class ForecastService:
+    """Mantém os modelos carregados e memoriza previsões por (base, versão, fh)."""
+
+    def __init__(self, root=ARTIFACT_DIR, cache_size=CACHE_SIZE, max_fh=MAX_FH):
+        self.root = Path(root)
+        self.max_fh = max_fh
+        self._predict = functools.lru_cache(maxsize=cache_size)(self._predict_uncached)
+
+    def names(self):
+        return sorted(p.parent.name for p in self.root.glob(f'*/{LATEST_FILE}')
+                      if not p.parent.name.endswith('-series'))
+
+    def warm(self):
+        """Carrega o modelo mais recente de cada base."""
+        for name in self.names():
+            self.version(name)
+
+    def version(self, name):
+        path = latest_bundle(name, root=self.root)
+        if path is None:
+            raise KeyError(f'Nenhum pacote para {name!r}')
+        load_bundle(str(path)).get_model()
+        return path.name
+
+    def _predict_uncached(self, name, version, fh):
+        result = load_bundle(str(self.root / name / version))
+        # Além do horizonte pré-calculado usa o modelo final já carregado (sem regressores exógenos)
+        predictions = result.forecast(fh, max_fh=self.max_fh)
+        return pd.DataFrame({
+            'periodo': predictions.index.astype(str),
+            'previsao': np.asarray(predictions, dtype=float),
+            'modelo': result.winner_id,
+            'versao': version,
+        })
+
+    def predict(self, name=DEFAULT_NAME, fh=36):
+        # Validado antes do cache: horizontes inválidos não ocupam entradas
+        fh = check_horizon(fh, self.max_fh)
+        return self._predict(name, self.version(name), fh)
+
+    def predict_series(self, serie, name=DEFAULT_NAME, fh=None):
+        fh = None if fh is None else check_horizon(fh, self.max_fh)
+        batch = load_latest_batch(name, root=self.root)
+        if batch is None:
+            raise KeyError(f'Nenhuma previsão em lote para {name!r}')
+        predictions = batch[0][batch[0]['serie'] == serie]
+        if predictions.empty:
+            raise KeyError(f'Série {serie!r} não encontrada')
+        return predictions if fh is None else predictions.iloc[:fh]
+
+    def cache_info(self):
+        return self._predict.cache_info()
+
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type):
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_frame(self, frame, fmt):
+            if fmt == 'csv':
+                self._send(200, frame.to_csv(index=False), 'text/csv')
+            else:
+                self._send(200, frame.to_json(orient='records', force_ascii=False), 'application/json')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            fmt = query.get('format', 'json')
+            try:
+                if url.path == '/predict':
+                    frame = service.predict(query.get('name', DEFAULT_NAME), query.get('fh', 36))
+                    self._send_frame(frame, fmt)
+                elif url.path == '/series':
+                    frame = service.predict_series(query['serie'], query.get('name', DEFAULT_NAME),
+                                                   query.get('fh'))
+                    self._send_frame(frame, fmt)
+                elif url.path == '/models':
+                    models = {name: service.version(name) for name in service.names()}
+                    self._send(200, json.dumps(models, ensure_ascii=False), 'application/json')
+                elif url.path == '/health':
+                    info = service.cache_info()
+                    self._send(200, json.dumps({'status': 'ok', 'cache_hits': info.hits,
+                                                'cache_misses': info.misses}), 'application/json')
+                else:
+                    self._send(404, json.dumps({'erro': 'rota desconhecida'}), 'application/json')
+            except KeyError as e:
+                self._send(404, json.dumps({'erro': str(e)}, ensure_ascii=False), 'application/json')
+            except ValueError as e:
+                self._send(400, json.dumps({'erro': str(e)}, ensure_ascii=False), 'application/json')
+            except Exception as e:
+                # Falhas ao carregar ou usar o modelo: responde em vez de derrubar a conexão
+                self.log_error('Erro ao atender %s: %r', self.path, e)
+                self._send(500, json.dumps({'erro': f'{type(e).__name__}: {e}'}, ensure_ascii=False),
+                           'application/json')
+
+    return Handler
+
+
+def run_server(host='127.0.0.1', port=8502, root=ARTIFACT_DIR, max_fh=MAX_FH):
+    """Sobe o serviço: GET /predict?name=&fh=&format=json|csv, /series?serie=, /models, /health.
+
+    ``fh`` fora de 1 a ``max_fh`` responde 400.
+    """
+    service = ForecastService(root=root, max_fh=max_fh)
+    service.warm()
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    print(f'Servindo previsões em http://{host}:{port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,133 @@
+# Ajuste de hiperparâmetros do modelo vencedor, em paralelo e com orçamento de tempo
+#
+# Cada configuração sorteada da grade do PyCaret é tratada como um candidato
+# de ``parallel_compare``: os pares (configuração, fold) rodam no pool de
+# processos, configurações ruins são podadas depois do primeiro fold e o
+# MASE do modelo com parâmetros padrão é a marca a superar.
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .cache import cache_key, get_cache
+from .compare import parallel_compare
+
+# Orçamento em segundos do ajuste; 0 desliga a etapa
+TUNE_BUDGET = float(os.environ.get('PREVISAO_TUNE_BUDGET', 0))
+N_TRIALS = 20
+# Configurações cujo MASE parcial passa deste múltiplo do líder são interrompidas
+TUNE_PRUNE_FACTOR = 1.2
+
+
+@dataclass
+class TuningResult:
+    """Melhor configuração encontrada (``params`` vazio se nenhuma superou o padrão).
+
+    ``complete`` indica que todas as tentativas terminaram (ou foram podadas)
+    dentro do ``budget``; um ajuste cortado pelo orçamento pode melhorar com
+    mais tempo.
+    """
+    model_id: str
+    params: dict
+    mase_default: float
+    mase_tuned: float
+    trials: pd.DataFrame
+    budget: float = None
+    complete: bool = True
+
+    @property
+    def improved(self):
+        return bool(self.params)
+
+    def covers(self, budget):
+        """Se este ajuste vale para um pedido com ``budget`` segundos."""
+        return self.complete or self.budget is None or budget is None or self.budget >= budget
+
+
+def tuning_key(data, target, session_id, model_id, n_trials=N_TRIALS, seed=123):
+    """Chave do ajuste: muda só quando os dados (ou o modelo ajustado) mudam.
+
+    O orçamento fica fora da chave: ``cached_tuning`` reaproveita um ajuste
+    completo com qualquer orçamento e refaz o que foi cortado por um menor.
+    """
+    return 'tune-' + cache_key(data, target=target, session_id=session_id, model_id=model_id,
+                               n_trials=n_trials, seed=seed)
+
+
+def sample_configs(grid, n_trials=N_TRIALS, seed=123):
+    """Sorteia até ``n_trials`` configurações distintas da grade do container."""
+    from sklearn.model_selection import ParameterSampler
+
+    if not grid:
+        return []
+    configs, seen = [], set()
+    for params in ParameterSampler(grid, n_iter=n_trials, random_state=seed):
+        signature = repr(sorted(params.items()))
+        if signature not in seen:
+            seen.add(signature)
+            configs.append(params)
+    return configs
+
+
+def build_estimator(exp, model_id, params=None):
+    """Estimador não ajustado do container ``model_id`` com os parâmetros informados."""
+    from pycaret.containers.models.time_series import get_all_model_containers
+
+    container = get_all_model_containers(exp)[model_id]
+    estimator = container.class_def(**container.args)
+    return estimator.set_params(**params) if params else estimator
+
+
+def tune_winner(exp, model_id, mase_default, budget=TUNE_BUDGET, n_trials=N_TRIALS, seed=123,
+                n_jobs=None, prune_factor=TUNE_PRUNE_FACTOR, fold_mase=None):
+    """Busca aleatória na grade do PyCaret nos mesmos folds da comparação.
+
+    Ao contrário de ``s.tune_model``, as tentativas rodam em processos
+    separados, param no fim do ``budget`` e são interrompidas quando o MASE
+    parcial fica muito acima da melhor tentativa (ou do modelo padrão nos
+    mesmos folds, se ``fold_mase`` traz o seu MASE por fold).
+    """
+    from pycaret.containers.models.time_series import get_all_model_containers
+
+    container = get_all_model_containers(exp)[model_id]
+    configs = sample_configs(getattr(container, 'tune_grid', None), n_trials=n_trials, seed=seed)
+    candidates = {
+        f'{model_id}#{i:02d}': (container.name, container.class_def(**container.args).set_params(**params))
+        for i, params in enumerate(configs)
+    }
+    if not candidates:
+        return TuningResult(model_id, {}, mase_default, mase_default, pd.DataFrame(), budget=budget)
+    try:
+        compared = parallel_compare(exp, budget=budget, prune_factor=prune_factor, n_jobs=n_jobs,
+                                    candidates=candidates,
+                                    bar=mase_default if fold_mase is None else fold_mase)
+    except RuntimeError:
+        # Nenhuma tentativa completou os folds dentro do orçamento
+        return TuningResult(model_id, {}, mase_default, mase_default, pd.DataFrame(), budget=budget,
+                            complete=False)
+    trials = compared.timings.join(compared.table['MASE'])
+    trials['params'] = [repr(configs[int(trial.rsplit('#', 1)[1])]) for trial in trials.index]
+    complete = not (trials['Status'] == 'tempo esgotado').any()
+    best = compared.best_id
+    mase_tuned = float(compared.table.loc[best, 'MASE'])
+    if mase_tuned >= mase_default:
+        return TuningResult(model_id, {}, mase_default, mase_default, trials, budget=budget, complete=complete)
+    return TuningResult(model_id, configs[int(best.rsplit('#', 1)[1])], mase_default, mase_tuned, trials,
+                        budget=budget, complete=complete)
+
+
+def cached_tuning(exp, data, target, session_id, model_id, mase_default, budget=TUNE_BUDGET,
+                  n_trials=N_TRIALS, seed=123, cache=None, fold_mase=None):
+    """Ajuste memorizado por versão dos dados: só roda de novo quando a planilha muda.
+
+    Um ajuste cortado pelo orçamento (tentativas com tempo esgotado ou
+    nenhuma concluída) só é reaproveitado por pedidos com orçamento igual ou
+    menor; com mais tempo, o ajuste roda de novo e substitui o anterior.
+    """
+    cache = get_cache() if cache is None else cache
+    key = tuning_key(data, target, session_id, model_id, n_trials=n_trials, seed=seed)
+    tuned = cache.get(key)
+    if tuned is None or not tuned.covers(budget):
+        tuned = cache.put(key, tune_winner(exp, model_id, mase_default, budget=budget,
+                                           n_trials=n_trials, seed=seed, fold_mase=fold_mase))
+    return tuned
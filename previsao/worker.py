@@ -0,0 +1,152 @@
+# Worker de treinamento fora do processo do Streamlit, alimentado por uma fila de jobs
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .cache import get_cache
+from .incremental import update_forecast
+from .pipeline import COMPARE_BUDGET, STAGES, forecast_key
+
+# Quantidade padrão de processos de treinamento simultâneos
+MAX_WORKERS = int(os.environ.get('PREVISAO_MAX_WORKERS', 2))
+# Segundos que um job com erro continua visível antes de poder ser reenviado
+FAILED_JOB_TTL = float(os.environ.get('PREVISAO_FAILED_JOB_TTL', 300))
+
+
+def _run_job(key, progress, data, target, session_id, fh, budget):
+    # Executado no processo filho: publica a etapa atual no dicionário compartilhado
+    def report(stage):
+        progress[key] = stage
+    return update_forecast(data, target=target, session_id=session_id, fh=fh, progress=report, budget=budget)
+
+
+class TrainingJob:
+    """Referência a um treinamento enfileirado ou em execução."""
+
+    def __init__(self, key, future, progress):
+        self.key = key
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._progress = progress
+
+    @property
+    def stage(self):
+        if self.future.done():
+            return 'erro' if self.future.exception() is not None else 'concluído'
+        return self._progress.get(self.key, 'na fila')
+
+    @property
+    def fraction(self):
+        """Fração aproximada do trabalho concluído, pela etapa atual."""
+        stage = self.stage
+        if stage == 'concluído':
+            return 1.0
+        if stage in STAGES:
+            return STAGES.index(stage) / len(STAGES)
+        return 0.0
+
+    @property
+    def elapsed(self):
+        return time.time() - self.submitted_at
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout=timeout)
+
+
+class TrainingWorker:
+    """Pool de processos com deduplicação (single-flight) de jobs idênticos.
+
+    Jobs com a mesma chave de cache enviados por sessões diferentes
+    compartilham a mesma execução; o resultado é gravado no cache ao final.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, cache=None, failed_ttl=FAILED_JOB_TTL):
+        ctx = mp.get_context('spawn')
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx)
+        self._manager = ctx.Manager()
+        self._progress = self._manager.dict()
+        self._cache = get_cache() if cache is None else cache
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.failed_ttl = failed_ttl
+
+    def submit(self, data, target='AUTOMÓVEIS', session_id=123, fh=36, budget=COMPARE_BUDGET, key=None):
+        if key is None:
+            key = forecast_key(data, target=target, session_id=session_id, fh=fh, budget=budget)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and self._expired(job):
+                del self._jobs[key]
+                job = None
+            if job is not None:
+                return job
+            cached = self._cache.get(key)
+            if cached is not None:
+                # Outro job terminou entre a consulta ao cache e o envio
+                future = Future()
+                future.set_result(cached)
+                return TrainingJob(key, future, self._progress)
+            future = self._executor.submit(_run_job, key, self._progress, data, target, session_id, fh, budget)
+            job = self._jobs[key] = TrainingJob(key, future, self._progress)
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return job
+
+    def _expired(self, job):
+        # Jobs com erro saem do registro depois de ``failed_ttl`` e o próximo pedido treina de novo
+        return job.finished_at is not None and time.time() - job.finished_at > self.failed_ttl
+
+    def _finish(self, key, future):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.finished_at = time.time()
+        if future.exception() is None:
+            # O processo filho já gravou o resultado em disco; aqui só aquece a memória
+            self._cache.put(key, future.result(), persist=False)
+            with self._lock:
+                self._jobs.pop(key, None)
+        # Jobs com erro permanecem registrados por ``failed_ttl`` para que a página mostre a falha
+        self._progress.pop(key, None)
+
+    def retry(self, key):
+        """Descarta um job com erro para que possa ser reenviado."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.done():
+                del self._jobs[key]
+
+    def pending(self):
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done()]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """Retorna o worker compartilhado por todas as sessões do processo."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TrainingWorker()
+        return _worker
+
+
+def request_forecast(data, target='AUTOMÓVEIS', session_id=123, fh=36, budget=COMPARE_BUDGET):
+    """Devolve ``(resultado, None)`` se já estiver no cache, senão ``(None, job)``."""
+    key = forecast_key(data, target=target, session_id=session_id, fh=fh, budget=budget)
+    result = get_cache().get(key)
+    if result is not None:
+        return result, None
+    return None, get_worker().submit(data, target=target, session_id=session_id, fh=fh, budget=budget, key=key)
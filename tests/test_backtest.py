@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from previsao.backtest import BacktestStore
+from previsao.baselines import METHODS, backtest_baselines
+
+
+def _series(n=240, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return np.round(1000 + 3 * t + 200 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 30, n))
+
+
+@pytest.mark.parametrize('name', sorted(METHODS))
+def test_incremental_run_matches_single_run(name):
+    y = _series()
+    origins = np.arange(60, 240, 12)
+    full = BacktestStore(y, horizon=12)
+    full.run(name, METHODS[name], origins)
+
+    partial = BacktestStore(y, horizon=12)
+    partial.run(name, METHODS[name], origins[:5])
+    assert partial.run(name, METHODS[name], origins) == len(origins) - 5
+    np.testing.assert_array_equal(partial.predictions[name], full.predictions[name])
+
+
+def test_scores_match_baseline_backtest():
+    y = _series()
+    origins = np.array([180, 192, 204])
+    store = BacktestStore(y, horizon=12)
+    store.run('theta', METHODS['theta'], origins)
+    expected = backtest_baselines(y, origins, 12, methods=['theta']).fold_scores['theta']
+    scores = store.scores('theta')
+    for metric, values in expected.items():
+        # As previsões do store são float32
+        np.testing.assert_allclose(scores[metric].to_numpy(), values, rtol=1e-4, err_msg=metric)
+
+
+def test_extend_fills_open_fold_and_roundtrip(tmp_path):
+    y = _series()
+    store = BacktestStore(y[:200], horizon=12)
+    store.add_fold('m', 200, y[200:212] + 10)
+    assert 200 not in store.scores('m').index
+    store.extend(y[:205])
+    assert store.scores('m').loc[200, 'MAE'] == pytest.approx(10)
+    assert store.horizon_mase('m', 5) == pytest.approx(store.scores('m', steps=5).loc[200, 'MASE'])
+
+    loaded = BacktestStore.load(store.save(tmp_path / 'backtest.npz'))
+    np.testing.assert_array_equal(loaded.predictions['m'], store.predictions['m'])
+    np.testing.assert_array_equal(loaded.origins, store.origins)
+
+
+def test_table_scores_models_on_common_cells():
+    y = _series()
+    store = BacktestStore(y[:200], horizon=12)
+    # 'longo' prevê 12 passos a partir de 180; 'curto' só o primeiro passo em 180 e 190
+    store.add_fold('longo', 180, y[180:192] + np.arange(1, 13) * 10)
+    store.add_fold('curto', 180, y[180:181] + 5)
+    store.add_fold('curto', 190, y[190:191] + 5)
+    table = store.table()
+    assert (table['Passos'] == 1).all()
+    assert table.loc['longo', 'MAE'] == pytest.approx(10)
+    assert table.loc['curto', 'MAE'] == pytest.approx(5)
+    # Sozinho, 'longo' é avaliado em todos os passos observados
+    assert store.table(['longo']).loc['longo', 'MAE'] == pytest.approx(np.mean(np.arange(1, 13) * 10))
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from previsao.baselines import METHODS, baseline_forecast
+
+
+def _series(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return 1000 + 3 * t + 200 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 30, n)
+
+
+@pytest.mark.parametrize('name', sorted(METHODS))
+def test_batched_origins_match_single_origin(name):
+    y = _series()
+    origins = np.array([100, 200, 290])
+    batched = METHODS[name](y, origins, 12)
+    for i, origin in enumerate(origins):
+        single = METHODS[name](y, np.array([origin]), 12)[0]
+        np.testing.assert_allclose(batched[i], single, rtol=1e-10)
+
+
+@pytest.mark.parametrize('n', [3, 20, 37, 60])
+def test_baseline_forecast_short_series(n):
+    y = pd.Series(_series(n), index=pd.period_range('2000-01', periods=n, freq='M'))
+    forecast, backtest = baseline_forecast(y, fh=36)
+    assert len(forecast) == 36
+    assert np.isfinite(forecast).all()
+    assert (backtest.origins >= 2).all()
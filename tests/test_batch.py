@@ -0,0 +1,33 @@
+import os
+import time
+
+import pytest
+
+from previsao.batch import THREAD_VARS, _memory_guard, _single_threaded
+from previsao.profiling import rss_mb
+
+needs_rss = pytest.mark.skipif(rss_mb() is None, reason='memória residente indisponível')
+
+
+@needs_rss
+def test_memory_guard_interrupts_above_resident_limit():
+    with pytest.raises(MemoryError):
+        with _memory_guard(1, interval=0.01):
+            deadline = time.perf_counter() + 5
+            while time.perf_counter() < deadline:
+                pass
+
+
+@needs_rss
+def test_memory_guard_lets_small_blocks_finish():
+    with _memory_guard(1024 ** 2, interval=0.01):
+        time.sleep(0.05)
+
+
+def test_single_threaded_restores_environment(monkeypatch):
+    monkeypatch.setenv('OMP_NUM_THREADS', '8')
+    monkeypatch.delenv('MKL_NUM_THREADS', raising=False)
+    with _single_threaded():
+        assert all(os.environ[var] == '1' for var in THREAD_VARS)
+    assert os.environ['OMP_NUM_THREADS'] == '8'
+    assert 'MKL_NUM_THREADS' not in os.environ
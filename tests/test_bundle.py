@@ -0,0 +1,35 @@
+import json
+
+import pandas as pd
+
+from previsao.bundle import MANIFEST_FILE, MODEL_FILE, load_bundle
+from previsao.cache import ResultCache
+
+
+def _bundle(path, model_bytes):
+    # Pacote mínimo gravado à mão (o write_bundle precisa de um modelo do PyCaret)
+    path.mkdir(parents=True)
+    (path / MANIFEST_FILE).write_text(json.dumps({'version': path.name, 'winner_id': 'naive'}), encoding='utf-8')
+    pd.DataFrame({'Model': ['Naive'], 'MASE': [1.0]}, index=['naive']).to_csv(path / 'comparison.csv')
+    pd.DataFrame({'y_pred': [1.0, 2.0]}, index=['2025-01', '2025-02']).to_csv(path / 'predictions.csv')
+    for figure in ('ts_figure.json', 'forecast_figure.json'):
+        (path / figure).write_text('{}', encoding='utf-8')
+    (path / MODEL_FILE).write_bytes(b'\0' * model_bytes)
+    return path
+
+
+def test_load_bundle_is_memoized_and_counts_the_model(tmp_path):
+    cache = ResultCache(tmp_path / 'cache', max_memory_bytes=10 * 1024 ** 2)
+    path = _bundle(tmp_path / 'v1', model_bytes=1024 ** 2)
+    result = load_bundle(path, cache=cache)
+    assert load_bundle(str(path), cache=cache) is result
+    assert cache._memory_bytes >= 1024 ** 2
+
+
+def test_bundles_are_evicted_within_the_memory_limit(tmp_path):
+    cache = ResultCache(tmp_path / 'cache', max_memory_bytes=3 * 1024 ** 2)
+    first = load_bundle(_bundle(tmp_path / 'v1', model_bytes=2 * 1024 ** 2), cache=cache)
+    load_bundle(_bundle(tmp_path / 'v2', model_bytes=2 * 1024 ** 2), cache=cache)
+    assert cache._memory_bytes <= cache.max_memory_bytes
+    # O pacote despejado é relido do disco
+    assert load_bundle(tmp_path / 'v1', cache=cache) is not first
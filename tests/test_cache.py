@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from previsao.cache import ResultCache, estimate_nbytes
+
+
+def test_estimate_nbytes_counts_large_arrays():
+    # Arrays grandes passam pelo pickle como PickleBuffer (protocolo 5)
+    assert estimate_nbytes(np.zeros(10000)) >= 80000
+    frame = pd.DataFrame(np.zeros((125000, 8)))
+    assert estimate_nbytes({'frame': frame, 'meta': 'x'}) >= frame.to_numpy().nbytes
+
+
+def test_large_entry_triggers_eviction(tmp_path):
+    cache = ResultCache(tmp_path, max_memory_bytes=1024 ** 2)
+    cache.put('a', np.zeros(100000), persist=False)
+    cache.put('b', np.zeros(100000), persist=False)
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert cache._memory_bytes <= cache.max_memory_bytes
@@ -0,0 +1,22 @@
+import numpy as np
+
+from previsao.compare import _prune
+
+
+def _scores(**done):
+    return {m: {fold: {'MASE': value} for fold, value in folds.items()} for m, folds in done.items()}
+
+
+def test_prune_uses_bar_on_same_folds():
+    # Fold 0 difícil para todos: a marca nesse fold também é alta
+    scores = _scores(a={0: 3.0}, b={0: 2.0})
+    status = {'a': 'ok', 'b': 'ok'}
+    _prune(scores, status, 3, 1.5, bar=np.array([2.5, 1.0, 1.0]))
+    assert status == {'a': 'ok', 'b': 'ok'}
+
+
+def test_prune_keeps_last_active_candidate():
+    scores = _scores(a={0: 3.0}, b={0: 2.0})
+    status = {'a': 'ok', 'b': 'ok'}
+    _prune(scores, status, 3, 1.5, bar=np.array([1.0, 1.0, 1.0]))
+    assert status == {'a': 'podado', 'b': 'ok'}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from previsao.features import FeatureStore, add_regressors
+
+
+def _regressors():
+    return pd.DataFrame({'selic': np.arange(60.0)}, index=pd.date_range('2018-01-01', periods=60, freq='MS'))
+
+
+@pytest.mark.parametrize('index', [
+    pd.date_range('2019-01-01', periods=24, freq='MS'),
+    pd.date_range('2019-01-31', periods=24, freq='ME'),
+    pd.period_range('2019-01', periods=24, freq='M'),
+])
+def test_add_regressors_aligns_by_month(tmp_path, index):
+    data = pd.DataFrame({'AUTOMÓVEIS': np.arange(24.0)}, index=index)
+    out = add_regressors(data, 'AUTOMÓVEIS', fh=3, regressors=_regressors(), store=FeatureStore(tmp_path))
+    assert len(out) == 27
+    assert out.index[:24].equals(index)
+    # Jan/2019 é o 13º mês dos regressores; os 3 meses futuros seguem mês a mês
+    np.testing.assert_array_equal(out['selic'].to_numpy(), np.arange(12.0, 39.0))
+
+
+def test_incremental_features_match_full_recompute(tmp_path):
+    rng = np.random.default_rng(2)
+    index = pd.date_range('2010-01-01', periods=110, freq='MS')
+    raw = pd.Series(rng.normal(10, 2, 110), index=index, name='ipca')
+    revised = raw.copy()
+    revised.iloc[97] += 1.5  # revisão de um mês recente
+
+    store = FeatureStore(tmp_path / 'incremental')
+    store.features(raw.iloc[:100])
+    store.features(revised.iloc[:101])
+    incremental = store.features(revised)
+
+    expected = FeatureStore(tmp_path / 'full').features(revised)
+    pd.testing.assert_frame_equal(incremental, expected, check_freq=False)
+
+
+def test_add_regressors_never_fills_history_backwards(tmp_path):
+    # O arquivo de regressores começa dois anos depois da série do alvo
+    index = pd.date_range('2015-01-01', periods=72, freq='MS')
+    data = pd.DataFrame({'AUTOMÓVEIS': np.arange(72.0)}, index=index)
+    regressors = pd.DataFrame({'selic': np.arange(100.0, 136.0)},
+                              index=pd.date_range('2017-01-01', periods=36, freq='MS'))
+    out = add_regressors(data, 'AUTOMÓVEIS', fh=3, regressors=regressors, store=FeatureStore(tmp_path))
+    # O histórico começa quando a defasagem de 12 meses já existe
+    assert out.index[0] == pd.Timestamp('2018-01-01')
+    assert not out.drop(columns='AUTOMÓVEIS').isna().any().any()
+    np.testing.assert_array_equal(out['selic_lag12'].iloc[:12], np.arange(100.0, 112.0))
+    # Depois do fim do arquivo o último valor se repete, inclusive no futuro
+    assert (out['selic'].loc['2020-01-01':] == 135.0).all()
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from previsao.metrics import METRIC_COLUMNS, score_all, score_folds
+
+
+@pytest.mark.parametrize('sp', [1, 12])
+def test_score_folds_matches_score_all(sp):
+    rng = np.random.default_rng(1)
+    y = 500 + np.cumsum(rng.normal(0, 10, 120))
+    origins = np.array([60, 84, 110, 119])
+    horizon = 12
+    idx = origins[:, None] + np.arange(horizon)
+    actual = np.where(idx < len(y), y[np.minimum(idx, len(y) - 1)], np.nan)
+    pred = actual + rng.normal(0, 15, actual.shape)
+    pred[np.isnan(actual)] = rng.normal(500, 10, np.isnan(actual).sum())
+
+    folds = score_folds(actual, pred, y, origins, sp)
+    for i, origin in enumerate(origins):
+        n = min(horizon, len(y) - origin)
+        expected = score_all(y[origin:origin + n], pred[i, :n], y[:origin], sp)
+        for metric in METRIC_COLUMNS:
+            np.testing.assert_allclose(folds[metric][i], expected[metric], rtol=1e-10, err_msg=metric)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from previsao.plots import downsample
+
+
+@pytest.mark.parametrize('max_points', [10, 51, 600])
+def test_downsample_respects_point_budget_and_keeps_endpoints(max_points):
+    values = np.random.default_rng(0).normal(size=5000)
+    kept = downsample(values, max_points)
+    assert len(kept) <= max_points
+    assert kept[0] == 0 and kept[-1] == len(values) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert np.argmin(values) in kept and np.argmax(values) in kept
+
+
+def test_downsample_keeps_min_and_max_of_each_bucket():
+    values = np.random.default_rng(1).normal(size=1000)
+    max_points = 42
+    kept = set(downsample(values, max_points).tolist())
+    n_buckets = (max_points - 2) // 2
+    inner = np.arange(1, len(values) - 1)
+    bucket = np.minimum((inner - 1) * n_buckets // (len(values) - 2), n_buckets - 1)
+    for b in range(n_buckets):
+        members = inner[bucket == b]
+        assert members[np.argmin(values[members])] in kept
+        assert members[np.argmax(values[members])] in kept
+
+
+def test_downsample_returns_short_series_whole():
+    assert downsample(np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+    assert downsample(np.arange(5.0), 0).tolist() == [0, 1, 2, 3, 4]
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from previsao.profiling import Profiler, _read_hwm_mb
+
+linux_only = pytest.mark.skipif(_read_hwm_mb() is None, reason='VmHWM só existe no Linux')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='CPU dos filhos indisponível no Windows')
+def test_stage_cpu_includes_children():
+    profiler = Profiler()
+    with profiler.stage('teste', 'filho'):
+        subprocess.run([sys.executable, '-c', 'sum(i * i for i in range(3_000_000))'], check=True)
+    record = profiler.records[0]
+    assert record['children_cpu_s'] > 0.05
+    assert record['cpu_s'] >= record['children_cpu_s']
+
+
+@linux_only
+def test_stage_peak_is_per_stage():
+    profiler = Profiler()
+    with profiler.stage('teste', 'grande'):
+        big = np.ones(400 * 1024 ** 2 // 8)
+        del big
+    with profiler.stage('teste', 'pequena'):
+        small = np.ones(1024)
+        del small
+    grande, pequena = profiler.records
+    assert grande['stage_peak_rss_mb'] - pequena['stage_peak_rss_mb'] > 300
+    # O pico do processo continua valendo depois do reinício do pico por etapa
+    assert pequena['process_max_rss_mb'] >= grande['stage_peak_rss_mb']
+
+
+@linux_only
+def test_nested_stage_keeps_outer_peak():
+    profiler = Profiler()
+    with profiler.stage('teste', 'externa'):
+        big = np.ones(400 * 1024 ** 2 // 8)
+        del big
+        with profiler.stage('teste', 'interna'):
+            pass
+    interna, externa = profiler.records
+    assert externa['stage_peak_rss_mb'] - interna['stage_peak_rss_mb'] > 300
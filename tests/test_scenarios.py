@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from previsao.scenarios import simulate_paths, summarize
+
+RESIDUALS = np.random.default_rng(0).normal(0, 0.05, size=120)
+
+
+def _paths(horizon, seed=123, **kwargs):
+    return simulate_paths(np.full(horizon, 1000.0), RESIDUALS, n_paths=2000, seed=seed, **kwargs)
+
+
+def test_simulate_paths_is_reproducible_by_seed():
+    first = _paths(36)
+    assert np.array_equal(first, _paths(36))
+    assert not np.array_equal(first, _paths(36, seed=7))
+    # O tamanho dos lotes não muda os caminhos
+    assert np.array_equal(first, _paths(36, chunk=300))
+
+
+def test_quantiles_are_ordered_around_the_point_forecast():
+    index = pd.period_range('2025-01', periods=24, freq='M')
+    monthly, annual = summarize(_paths(24), np.full(24, 1000.0), index)
+    for frame in (monthly, annual):
+        assert (frame['p05'] <= frame['p50']).all()
+        assert (frame['p50'] <= frame['p95']).all()
+        assert (frame['p05'] <= frame['previsao']).all()
+        assert (frame['previsao'] <= frame['p95']).all()
+
+
+def test_year_split_between_history_and_forecast():
+    # 2023 completo e 2024 até setembro no histórico; previsão de out/2024 a mar/2026
+    history = pd.Series(100.0, index=pd.period_range('2023-01', '2024-09', freq='M'))
+    index = pd.period_range('2024-10', periods=18, freq='M')
+    point = np.full(18, 1000.0)
+    _, annual = summarize(_paths(18), point, index, history=history)
+
+    assert list(annual.index) == [2024, 2025]  # 2026 fica incompleto no horizonte
+    assert annual.loc[2024, 'observado'] == pytest.approx(900.0)
+    assert annual.loc[2024, 'previsao'] == pytest.approx(900.0 + 3000.0)
+    assert annual.loc[2025, 'observado'] == 0
+    assert annual.loc[2025, 'previsao'] == pytest.approx(12000.0)
+    # Os quantis anuais somam o observado aos caminhos dos meses previstos
+    assert annual.loc[2024, 'p05'] >= 900.0
+    # 2024 é comparado ao realizado de 2023; 2025 à previsão de 2024
+    assert annual.loc[2024, 'variacao_pct'] == pytest.approx((3900.0 / 1200.0 - 1) * 100)
+    assert annual.loc[2025, 'variacao_pct'] == pytest.approx((12000.0 / 3900.0 - 1) * 100)
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from previsao.pipeline import ForecastResult
+from previsao.serve import ForecastService
+
+
+def _result():
+    predictions = pd.DataFrame({'y_pred': [1.0, 2.0, 3.0]}, index=pd.period_range('2025-01', periods=3, freq='M'))
+    return ForecastResult(comparison=None, final_model=None, predictions=predictions, ts_figure=None,
+                          forecast_figure=None)
+
+
+@pytest.mark.parametrize('fh', [0, -3, 121])
+def test_forecast_rejects_invalid_horizon(fh):
+    with pytest.raises(ValueError):
+        _result().forecast(fh, max_fh=120)
+
+
+def test_forecast_within_stored_horizon():
+    assert _result().forecast(2).tolist() == [1.0, 2.0]
+
+
+@pytest.mark.parametrize('fh', [0, -1, 61, 'abc'])
+def test_service_rejects_invalid_horizon_before_loading(tmp_path, fh):
+    service = ForecastService(root=tmp_path, max_fh=60)
+    with pytest.raises(ValueError):
+        service.predict('base', fh)
+    with pytest.raises(ValueError):
+        service.predict_series('AUTOMÓVEIS', 'base', fh)
+    assert service.cache_info().currsize == 0
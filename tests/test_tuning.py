@@ -0,0 +1,38 @@
+import pandas as pd
+
+from previsao import tuning
+from previsao.cache import ResultCache
+from previsao.tuning import TuningResult, cached_tuning
+
+DATA = pd.DataFrame({'AUTOMÓVEIS': [1.0, 2.0, 3.0]})
+
+
+def _run(monkeypatch, tmp_path, outcomes):
+    # Substitui o ajuste (que precisa do PyCaret) e conta as execuções
+    calls = []
+
+    def fake_tune(exp, model_id, mase_default, budget=None, **kwargs):
+        calls.append(budget)
+        return TuningResult(model_id, {}, mase_default, mase_default, pd.DataFrame(), budget=budget,
+                            complete=outcomes[len(calls) - 1])
+
+    monkeypatch.setattr(tuning, 'tune_winner', fake_tune)
+    cache = ResultCache(tmp_path)
+    return calls, lambda budget: cached_tuning(None, DATA, 'AUTOMÓVEIS', 123, 'omp_cds_dt', 1.0,
+                                               budget=budget, cache=cache)
+
+
+def test_cut_short_tuning_reruns_with_larger_budget(monkeypatch, tmp_path):
+    calls, tune = _run(monkeypatch, tmp_path, [False, True])
+    tune(60)
+    tune(60)
+    tune(600)
+    tune(1200)
+    assert calls == [60, 600]
+
+
+def test_complete_tuning_is_reused_for_any_budget(monkeypatch, tmp_path):
+    calls, tune = _run(monkeypatch, tmp_path, [True])
+    tune(60)
+    tune(600)
+    assert calls == [60]